@@ -0,0 +1,69 @@
+"""Benchmark src.vtt_parser against webvtt-py on data/transcripts
+
+Usage:
+    python benchmarks/bench_vtt_parser.py [--limit N] [--repeat N]
+
+Both parsers are run over the same files, their output is checked for
+equality, and the best of `--repeat` runs is reported for each.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import webvtt
+
+# Add repo root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.transcript_manager import TRANSCRIPT_DIR
+from src.vtt_parser import parse_vtt, timestamp_to_seconds
+
+
+def parse_with_webvtt(vtt_file):
+    """The previous ingest path: webvtt.read plus string timestamp parsing"""
+    return [
+        (timestamp_to_seconds(caption.start), timestamp_to_seconds(caption.end), caption.text)
+        for caption in webvtt.read(vtt_file)
+    ]
+
+
+def time_parser(parse, files, repeat):
+    """Return (best seconds, cue count) for parsing every file"""
+    best = None
+    cues = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cues = sum(len(parse(str(vtt_file))) for vtt_file in files)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, cues
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--limit', type=int, default=None, help="Only use the first N files")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per parser")
+    args = parser.parse_args()
+
+    files = sorted(TRANSCRIPT_DIR.glob('*.vtt'))[:args.limit]
+    if not files:
+        print(f"No VTT files found in {TRANSCRIPT_DIR}")
+        return
+
+    mismatches = [f.name for f in files if parse_vtt(str(f)) != parse_with_webvtt(str(f))]
+    if mismatches:
+        print(f"Output differs from webvtt-py for {len(mismatches)} files: {', '.join(mismatches[:5])}")
+
+    print(f"Parsing {len(files)} files, best of {args.repeat}")
+    results = {}
+    for name, parse in (('webvtt-py', parse_with_webvtt), ('vtt_parser', parse_vtt)):
+        seconds, cues = time_parser(parse, files, args.repeat)
+        results[name] = seconds
+        print(f"  {name:<11} {seconds:7.3f}s  {cues:,} cues  {cues / seconds:,.0f} cues/sec")
+
+    print(f"Speedup: {results['webvtt-py'] / results['vtt_parser']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
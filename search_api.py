@@ -0,0 +1,224 @@
+"""JSON API over the sermon database, for front ends other than the Streamlit app
+
+Usage:
+    python search_api.py [--host HOST] [--port PORT] [--max-age SECONDS] [--db PATH]
+
+Serves the same read-only TranscriptManager as streamlit_app.py from a
+threaded stdlib HTTP server, so each request costs one query on a warm
+pooled connection rather than a Streamlit rerun. Every endpoint is a GET
+returning JSON:
+
+    /search?q=grace&page=1&page_size=50&order=relevance&start=2023-01-01&end=2023-12-31&prefix=0&context=2
+    /suggest?q=gra&limit=8
+    /videos?speaker=&year=2024&book=John&topic=Grace
+    /facets?speaker=&year=2024&book=John&topic=Grace
+    /speakers?bible=1
+    /bible?year=2024&speaker=
+    /bible/<book>?year=2024&speaker=&limit=10
+
+Responses carry Cache-Control and an ETag holding the database id and
+generation, so a CDN or browser can cache them and revalidate for free
+until an ingest, extraction run, refresh or rebuild changes the data.
+"""
+import argparse
+import json
+import sys
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.transcript_manager import TranscriptManager, vimeo_player_url
+
+
+# Seconds shared caches may serve a response before revalidating it
+DEFAULT_MAX_AGE = 300
+
+# Largest page of search results a client may ask for
+MAX_PAGE_SIZE = 200
+
+# Most cues of context a client may ask for either side of a match
+MAX_CONTEXT = 10
+
+
+class BadRequest(ValueError):
+    """A query parameter is missing or malformed"""
+
+
+def get_param(params, name, default=None, convert=str):
+    """Read one query parameter, converted with `convert`"""
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        return convert(values[-1])
+    except ValueError:
+        raise BadRequest(f"Invalid value for {name!r}: {values[-1]!r}")
+
+
+def get_filters(params):
+    """Video List filters from the query string; an empty speaker selects videos with no known speaker"""
+    return {
+        'speaker': get_param(params, 'speaker'),
+        'year': get_param(params, 'year', convert=int),
+        'book': get_param(params, 'book'),
+        'topic': get_param(params, 'topic'),
+    }
+
+
+class SearchAPIHandler(BaseHTTPRequestHandler):
+    manager = None
+    max_age = DEFAULT_MAX_AGE
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query, keep_blank_values=True)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        route = self.routes.get(parts[0] if parts else '')
+        # Only /bible/<book> takes a path argument
+        if route is None or len(parts) > (2 if route is SearchAPIHandler.bible else 1):
+            self.send_json({'error': f"No such endpoint: {url.path}"}, HTTPStatus.NOT_FOUND)
+            return
+
+        database_id, generation = self.manager.get_version()
+        etag = f'"{database_id:x}-{generation}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_cache_headers(etag)
+            self.end_headers()
+            return
+
+        try:
+            body = route(self, params, *parts[1:])
+        except ValueError as e:
+            self.send_json({'error': str(e)}, HTTPStatus.BAD_REQUEST)
+            return
+        self.send_json(body, etag=etag)
+
+    def send_cache_headers(self, etag):
+        self.send_header('Cache-Control', f'public, max-age={self.max_age}')
+        self.send_header('ETag', etag)
+
+    def send_json(self, body, status=HTTPStatus.OK, etag=None):
+        """Write body as a JSON response; only successful responses may be cached"""
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        if etag:
+            self.send_cache_headers(etag)
+        else:
+            self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def search(self, params):
+        """Words match exactly unless prefix=1, which also matches longer words the last one starts"""
+        query = get_param(params, 'q', '')
+        if not query.strip():
+            raise BadRequest("Missing search text 'q'")
+        context_size = get_param(params, 'context', 2, int)
+        if not 0 <= context_size <= MAX_CONTEXT:
+            raise BadRequest(f"'context' must be between 0 and {MAX_CONTEXT}")
+        return self.manager.search(
+            query,
+            page=get_param(params, 'page', 1, int),
+            page_size=min(max(1, get_param(params, 'page_size', 50, int)), MAX_PAGE_SIZE),
+            order=get_param(params, 'order', 'relevance'),
+            search_titles=get_param(params, 'titles', '1') != '0',
+            context_size=context_size,
+            start_date=get_param(params, 'start', convert=date.fromisoformat),
+            end_date=get_param(params, 'end', convert=date.fromisoformat),
+            prefix=get_param(params, 'prefix', '0') != '0',
+        )
+
+    def suggest(self, params):
+        query = get_param(params, 'q', '')
+        return {
+            'query': query,
+            'suggestions': [
+                {'term': term, 'sermons': sermons}
+                for term, sermons in self.manager.suggest(query, get_param(params, 'limit', 8, int))
+            ]
+        }
+
+    def videos(self, params):
+        videos = self.manager.filter_videos(**get_filters(params))
+        for video in videos:
+            video['url'] = vimeo_player_url(video['video_id'])
+        return {'videos': videos}
+
+    def facets(self, params):
+        return {'facets': self.manager.get_facet_counts(**get_filters(params))}
+
+    def speakers(self, params):
+        return {'speakers': self.manager.get_speakers(get_param(params, 'bible', '0') != '0')}
+
+    def bible(self, params, book=None):
+        year = get_param(params, 'year', convert=int)
+        speaker = get_param(params, 'speaker')
+        if book is None:
+            return {
+                'books': [
+                    {'book': name, 'references': count}
+                    for name, count in self.manager.get_book_counts(year, speaker)
+                ]
+            }
+
+        sermons = self.manager.get_chapter_sermons(book, get_param(params, 'limit', 10, int))
+        return {
+            'book': book,
+            'chapters': [
+                {'chapter': chapter, 'references': count}
+                for chapter, count in self.manager.get_chapter_counts(book, year, speaker)
+            ],
+            'verses': [
+                {'chapter': chapter, 'verse_start': start, 'verse_end': end, 'references': count}
+                for chapter, start, end, count in self.manager.get_verse_counts(book)
+            ],
+            'sermons': [
+                {'chapter': chapter, 'title': title, 'video_id': video_id, 'start_time': start_time,
+                 'url': vimeo_player_url(video_id, start_time)}
+                for chapter, references in sermons.items()
+                for title, video_id, start_time in references
+            ]
+        }
+
+    routes = {
+        'search': search,
+        'suggest': suggest,
+        'videos': videos,
+        'facets': facets,
+        'speakers': speakers,
+        'bible': bible,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on')
+    parser.add_argument('--max-age', type=int, default=DEFAULT_MAX_AGE,
+                        help='seconds clients and CDNs may cache responses')
+    parser.add_argument('--db', type=Path, default=None, help='database file (default: data/database/transcripts.db)')
+    args = parser.parse_args()
+
+    SearchAPIHandler.manager = TranscriptManager(args.db, read_only=True)
+    SearchAPIHandler.max_age = args.max_age
+    server = ThreadingHTTPServer((args.host, args.port), SearchAPIHandler)
+    print(f"Serving {SearchAPIHandler.manager.db_path} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        SearchAPIHandler.manager.pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Pool of warm read-only SQLite connections
+
+Opening a connection re-reads the schema and starts with an empty page
+cache, so the pool keeps a few open and hands them out to whichever
+thread needs one. Streamlit runs every rerun on a fresh thread, which
+is why connections are checked out and returned rather than kept in
+thread-local storage. A connection is only ever used by one thread at
+a time.
+
+With immutable=True the file is opened with SQLite's immutable flag:
+no locks are taken and nothing is checked for changes, so several
+processes can serve the same file straight from the OS page cache.
+Only use it for a database nothing writes to while it is being served;
+a replaced or rewritten file is still picked up because connections
+are reopened when the file's inode, size or mtime changes.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Applied to every pooled connection
+READ_PRAGMAS = (
+    'PRAGMA query_only = ON',
+    'PRAGMA cache_size = -65536',  # 64 MB page cache
+    'PRAGMA temp_store = MEMORY',
+)
+
+# Bytes of the file to memory-map by default
+MMAP_SIZE = 268435456  # 256 MB
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection that remembers which database file it opened"""
+    file_id = None
+
+
+class ConnectionPool:
+    def __init__(self, db_path, size=8, cached_statements=256, immutable=False, mmap_size=MMAP_SIZE):
+        self.db_path = Path(db_path)
+        self.size = size
+        self.cached_statements = cached_statements
+        self.immutable = immutable
+        self.mmap_size = mmap_size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _file_id(self):
+        """Identify the database file and its version, so a replaced or rewritten file is noticed"""
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _connect(self, file_id):
+        """Open a read-only connection with the pool's settings"""
+        uri = f'{self.db_path.resolve().as_uri()}?mode=ro'
+        if self.immutable:
+            uri += '&immutable=1'
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            factory=PooledConnection
+        )
+        conn.file_id = file_id
+        for pragma in READ_PRAGMAS:
+            conn.execute(pragma)
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        return conn
+
+    def acquire(self):
+        """Check out a connection; hand it back with release() when done"""
+        file_id = self._file_id()
+        with self._lock:
+            while self._idle:
+                conn = self._idle.pop()
+                if conn.file_id == file_id:
+                    return conn
+                # The database was replaced or written to since this connection was opened
+                conn.close()
+        return self._connect(file_id)
+
+    def release(self, conn):
+        """Return a connection to the pool, closing it if the pool is full
+
+        Close the connection's cursors first: a half-read SELECT would
+        otherwise keep a shared lock on the database and block ingest.
+        """
+        conn.set_progress_handler(None, 0)
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def cursor(self):
+        """Check out a connection and yield a cursor on it, closing and returning both afterwards"""
+        conn = self.acquire()
+        c = conn.cursor()
+        try:
+            yield c
+        finally:
+            c.close()
+            self.release(conn)
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
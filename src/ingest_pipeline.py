@@ -0,0 +1,135 @@
+"""Parallel transcript ingest
+
+VTT files are parsed in a process pool and the resulting caption tuples
+are streamed through a bounded queue to a single writer thread, which
+owns the only connection to the database.
+
+Usage:
+    python -m src.ingest_pipeline [--workers N]
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from .transcript_manager import TRANSCRIPT_DIR, TranscriptManager, transcript_fingerprint
+from .vtt_parser import parse_vtt
+
+VTT_SUFFIX = '_en-x-autogen.vtt'
+
+# Marks the end of the stream for the writer thread
+_DONE = object()
+
+
+def find_transcripts(transcript_dir=TRANSCRIPT_DIR, video_data_path=None):
+    """Pair every VTT file in transcript_dir with its video_data.json entry"""
+    video_data_path = video_data_path or transcript_dir / 'video_data.json'
+    with open(video_data_path, 'r', encoding='utf-8') as f:
+        videos = {video['id']: video for video in json.load(f)}
+
+    pairs = []
+    for vtt_file in sorted(transcript_dir.glob(f'*{VTT_SUFFIX}')):
+        video_id = vtt_file.name[:-len(VTT_SUFFIX)]
+        if video_id in videos:
+            pairs.append((videos[video_id], vtt_file))
+        else:
+            print(f"Skipping {vtt_file.name}: no entry in {video_data_path.name}")
+    return pairs
+
+
+def _parse_job(vtt_file):
+    """Worker entry point: fingerprint and parse one file"""
+    source = (Path(vtt_file).name,) + transcript_fingerprint(vtt_file)
+    return parse_vtt(str(vtt_file)), source
+
+
+def ingest_parallel(pairs, manager=None, workers=None, queue_size=32, force=False, **load_kwargs):
+    """Parse (video_data, vtt_file) pairs in parallel and load them with one writer
+
+    Files whose size and mtime match the manifest are skipped before any
+    work is queued unless `force` is set. At most `queue_size` parsed
+    transcripts are held in memory at once: workers stop being fed while
+    the writer is behind. Extra keyword arguments are passed to
+    TranscriptManager.add_parsed_videos.
+    """
+    manager = manager or TranscriptManager()
+    if not force:
+        pairs = manager.stale_transcripts(pairs)
+    if not pairs:
+        print("All transcripts are up to date")
+        return {'videos': 0, 'segments': 0, 'unchanged': 0, 'failed': []}
+
+    workers = workers or os.cpu_count() or 1
+    parsed = queue.Queue(maxsize=queue_size)
+    result = {}
+
+    def writer():
+        drained = False
+
+        def stream():
+            nonlocal drained
+            yield from iter(parsed.get, _DONE)
+            drained = True
+
+        try:
+            result['stats'] = manager.add_parsed_videos(stream(), force=force, **load_kwargs)
+        finally:
+            # Keep draining if the load stopped early so producers never block
+            if not drained:
+                while parsed.get() is not _DONE:
+                    pass
+
+    writer_thread = threading.Thread(target=writer, name='transcript-writer')
+    writer_thread.start()
+
+    parse_failures = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            jobs = iter(pairs)
+            # Keep the pool busy without parsing further ahead than the queue allows
+            max_in_flight = workers + queue_size
+            while True:
+                for video_data, vtt_file in jobs:
+                    pending[executor.submit(_parse_job, vtt_file)] = (video_data, vtt_file)
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    video_data, vtt_file = pending.pop(future)
+                    try:
+                        captions, source = future.result()
+                    except Exception as e:
+                        print(f"Error adding video {video_data.get('id', 'Unknown ID')} with VTT file {vtt_file}: {e}")
+                        parse_failures.append(video_data.get('id'))
+                        continue
+                    parsed.put((video_data, captions, source))
+    finally:
+        parsed.put(_DONE)
+        writer_thread.join()
+
+    stats = result.get('stats', {'videos': 0, 'segments': 0, 'unchanged': 0, 'failed': []})
+    stats['failed'] = parse_failures + stats['failed']
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load VTT transcripts into the search database")
+    parser.add_argument('--workers', type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument('--queue-size', type=int, default=32, help="Parsed transcripts buffered for the writer")
+    parser.add_argument('--force', action='store_true', help="Re-ingest every transcript, even unchanged ones")
+    args = parser.parse_args()
+
+    stats = ingest_parallel(find_transcripts(), workers=args.workers, queue_size=args.queue_size, force=args.force)
+    if stats['failed']:
+        print(f"{len(stats['failed'])} videos failed: {', '.join(map(str, stats['failed']))}")
+
+
+if __name__ == '__main__':
+    main()
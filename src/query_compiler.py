@@ -0,0 +1,38 @@
+"""Turn what users type into safe FTS5 MATCH expressions
+
+Search boxes pass raw text, which FTS5 would otherwise parse as query
+syntax: quotes, hyphens, parentheses or a bare AND/NEAR raise syntax
+errors or change the meaning of the search. The compiler keeps only
+the words, quotes each whitespace-separated chunk as a phrase (so
+"God's" and "well-known" still match as written) and, while the user
+is still typing, makes the last word a prefix so partial words match.
+"""
+import re
+
+# Runs of letters and digits; FTS5's unicode61 tokenizer splits on everything else
+WORD = re.compile(r'[^\W_]+')
+
+# Shortest last word searched as a prefix; shorter ones would match a large
+# part of the vocabulary and are not covered by the prefix indexes
+MIN_PREFIX_LENGTH = 2
+
+
+def compile_query(text, prefix=True):
+    """Compile user input into an FTS5 expression, or '' if it has no words
+
+    Every chunk must match (implicit AND). With `prefix` set and no
+    trailing space after the last word, that word also matches any word
+    it starts, e.g. "amazing gra" finds "amazing grace".
+    """
+    phrases = []
+    for chunk in text.split():
+        words = WORD.findall(chunk)
+        if words:
+            phrases.append('"' + ' '.join(words) + '"')
+    if not phrases:
+        return ''
+
+    last_word = WORD.findall(text.split()[-1])
+    if prefix and not text[-1:].isspace() and last_word and len(last_word[-1]) >= MIN_PREFIX_LENGTH:
+        phrases[-1] += ' *'
+    return ' '.join(phrases)
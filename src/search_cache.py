@@ -0,0 +1,54 @@
+"""Bounded LRU cache with expiry for search results
+
+One instance lives on the TranscriptManager, which Streamlit shares
+between sessions, so a popular query is only run once per database
+generation.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_query(query):
+    """Collapse whitespace so trivially different inputs share a cache entry"""
+    return ' '.join(query.split())
+
+
+class SearchCache:
+    def __init__(self, maxsize=512, ttl=900):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,59 @@
+"""Run searches on a worker pool, cancelling the ones a session has moved past
+
+Search-as-you-type starts a query on nearly every keystroke, and a slow
+one for "th" would otherwise keep a connection busy after the user has
+typed "theo". Each search runs on a worker thread with a cancel event
+that TranscriptManager.search checks from a SQLite progress handler.
+Submitting a new search for a session sets the event of that session's
+previous one, so only its latest search competes for CPU and I/O.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SearchRunner:
+    def __init__(self, manager, workers=4):
+        self.manager = manager
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search')
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, query, **kwargs):
+        """Start a search for a session and cancel its previous one
+
+        Takes the arguments of TranscriptManager.search and returns a
+        Future for its response, which is None if the search was cancelled.
+        """
+        cancel = threading.Event()
+        with self._lock:
+            previous = self._pending.get(session_id)
+            self._pending[session_id] = cancel
+        if previous is not None:
+            previous.set()
+        return self._executor.submit(self._run, session_id, cancel, query, kwargs)
+
+    def _run(self, session_id, cancel, query, kwargs):
+        try:
+            if cancel.is_set():
+                # Superseded while still queued
+                return None
+            return self.manager.search(query, cancel=cancel, **kwargs)
+        finally:
+            with self._lock:
+                if self._pending.get(session_id) is cancel:
+                    del self._pending[session_id]
+
+    def cancel(self, session_id):
+        """Cancel a session's running or queued search, if it has one"""
+        with self._lock:
+            cancel = self._pending.pop(session_id, None)
+        if cancel is not None:
+            cancel.set()
+
+    def shutdown(self):
+        """Cancel every search and stop the workers"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for cancel in pending.values():
+            cancel.set()
+        self._executor.shutdown(wait=True)
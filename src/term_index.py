@@ -0,0 +1,52 @@
+"""In-memory prefix lookup over the search vocabulary
+
+Built from the search_terms table that ingest materializes from the
+full-text index: one entry per indexed word with the number of sermons
+and segments it appears in. Terms are kept in one sorted list, so all
+completions of a prefix form a contiguous slice found by binary search.
+The top completions of every one- and two-letter prefix, whose slices
+are the longest, are ranked up front.
+"""
+import heapq
+from bisect import bisect_left
+
+# Prefixes up to this length have their top completions ranked in advance
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+
+class TermIndex:
+    def __init__(self, rows, max_suggestions=20):
+        """Index (term, sermons, segments) rows; lookups return at most max_suggestions terms"""
+        rows = sorted(rows)
+        self.terms = [row[0] for row in rows]
+        self.sermons = [row[1] for row in rows]
+        self.segments = [row[2] for row in rows]
+        self.max_suggestions = max_suggestions
+        self._top = {}
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            for prefix in {term[:length] for term in self.terms if len(term) >= length}:
+                self._top[prefix] = self._rank(prefix, max_suggestions)
+
+    def _span(self, prefix):
+        """Index range of the terms starting with prefix"""
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + '\U0010ffff', start)
+        return start, end
+
+    def _rank(self, prefix, limit):
+        """Positions of the `limit` completions found in the most sermons"""
+        start, end = self._span(prefix)
+        return heapq.nlargest(limit, range(start, end), key=lambda i: (self.sermons[i], self.segments[i]))
+
+    def complete(self, prefix, limit=10):
+        """Terms starting with prefix as (term, sermons) pairs, most widespread first"""
+        if not prefix or limit <= 0:
+            return []
+        limit = min(limit, self.max_suggestions)
+        positions = self._top.get(prefix)
+        if positions is None:
+            positions = self._rank(prefix, limit)
+        return [(self.terms[i], self.sermons[i]) for i in positions[:limit]]
+
+    def __len__(self):
+        return len(self.terms)
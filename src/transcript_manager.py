@@ -1,24 +1,206 @@
+import hashlib
+import os
+import secrets
 import sqlite3
-import webvtt # Make sure this import is present
-from pathlib import Path
+import threading
+import time
 from pathlib import Path
 
+from .connection_pool import MMAP_SIZE, ConnectionPool
+from .query_compiler import WORD, compile_query
+from .search_cache import SearchCache, normalize_query
+from .term_index import TermIndex
+from .video_catalog import VideoCatalog, extract_speaker, published_on
+from .vtt_parser import parse_vtt, timestamp_to_seconds
+
 # Define DATABASE_PATH directly since config.py is not in repo
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / 'data'
 DATABASE_DIR = DATA_DIR / 'database'
 DATABASE_PATH = DATABASE_DIR / 'transcripts.db'
+TRANSCRIPT_DIR = DATA_DIR / 'transcripts'
+
+
+# Connection settings used while bulk loading transcripts
+BULK_LOAD_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -262144',  # 256 MB page cache
+)
+
+
+def transcript_fingerprint(vtt_file):
+    """Return (size, mtime_ns, sha256) identifying a transcript file's contents"""
+    stat = os.stat(vtt_file)
+    with open(vtt_file, 'rb') as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+    return stat.st_size, stat.st_mtime_ns, content_hash
+
+
+# Full-text index over transcript_segments.text; everything else is joined in by rowid.
+# The prefix indexes serve the 2-4 character prefix queries of search-as-you-type.
+SEARCH_INDEX_SQL = '''
+    CREATE VIRTUAL TABLE transcript_search
+    USING fts5(text, content='transcript_segments', content_rowid='id', prefix='2 3 4')
+'''
+
+# Full-text index over video titles and descriptions. It keeps its own copy
+# of the (small) text because videos has no stable integer rowid to point at.
+VIDEO_SEARCH_SQL = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS video_search
+    USING fts5(title, description, video_id UNINDEXED, prefix='2 3 4')
+'''
+
+# bm25 column weights for video_search: a word in the title counts ten times one in the description
+VIDEO_SEARCH_WEIGHTS = (10.0, 1.0)
+
+
+def vimeo_player_url(video_id, start_time=None):
+    """Build a player.vimeo.com link (avoids Vimeo's spam check), optionally at a time"""
+    url = f"https://player.vimeo.com/video/{video_id}"
+    if start_time is not None:
+        url += f"#t={int(start_time)}s"
+    return url
+
+
+# ORDER BY clauses for TranscriptManager.search; rank is FTS5's bm25() score
+SEARCH_ORDERS = {
+    'relevance': 'transcript_search.rank',
+    'date': 'v.date_published DESC, s.start_time',
+}
+
+
+# Search results whose context windows are fetched per query (3 variables each)
+CONTEXT_CHUNK_SIZE = 250
+
+
+# SQLite VM instructions between checks of a search's cancel event
+CANCEL_CHECK_INSTRUCTIONS = 1000
+
+
+# Schema version stored in PRAGMA user_version, see TranscriptManager.setup_database
+SCHEMA_VERSION = 11
+
+
+# database_info key set while the tables derived from videos and transcripts need rebuilding
+STALE_KEY = 'derived_tables_stale'
+
+
+# Video List filters materialized in video_facets; a video with no known speaker has speaker ''
+FACETS = ('speaker', 'year', 'book', 'topic')
 
 
 class TranscriptManager:
-    def __init__(self):
-        self.db_path = DATABASE_PATH
-        self.setup_database()
+    def __init__(self, db_path=None, read_only=False):
+        """Open the transcripts database, creating or migrating it unless read_only (serving only, no DDL or ingest)"""
+        self.db_path = db_path or DATABASE_PATH
+        self.read_only = read_only
+        self.search_cache = SearchCache()
+        # Search box completions, loaded on first use and after every ingest
+        self._term_index = None
+        self._term_index_version = None
+        self._term_index_lock = threading.Lock()
+        if read_only:
+            # Map the whole file so worker processes share the OS page cache
+            mmap_size = max(os.path.getsize(self.db_path), MMAP_SIZE)
+            self.pool = ConnectionPool(self.db_path, immutable=True, mmap_size=mmap_size)
+            self._check_schema_version()
+        else:
+            self.setup_database()
+            # Warm read-only connections shared by every thread using this manager
+            self.pool = ConnectionPool(self.db_path)
+
+    def _check_schema_version(self):
+        """Refuse to serve a database whose schema has not been upgraded by setup_database"""
+        with self.pool.cursor() as c:
+            c.execute('PRAGMA user_version')
+            version = c.fetchone()[0]
+            if version == SCHEMA_VERSION:
+                c.execute(f"SELECT value FROM database_info WHERE key = '{STALE_KEY}'")
+                stale = c.fetchone()
+        if version != SCHEMA_VERSION:
+            raise RuntimeError(
+                f"{self.db_path} has schema version {version}, expected {SCHEMA_VERSION}; "
+                "open it with TranscriptManager() (e.g. run update_database.py) to upgrade it"
+            )
+        if stale and stale[0]:
+            print(f"Warning: the Video List, heat map and search suggestions in {self.db_path} are out of date; "
+                  "open it with TranscriptManager() to rebuild them")
+
+    def _check_writable(self):
+        """Refuse to write through a manager opened with read_only=True"""
+        if self.read_only:
+            raise RuntimeError(f"{self.db_path} is opened read-only; use TranscriptManager() to change it")
 
     def setup_database(self):
-        """Create SQLite database and tables"""
+        """Create the database or bring its schema up to SCHEMA_VERSION, one transaction per pending step"""
+        self._check_writable()
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
+        try:
+            c.execute('PRAGMA user_version')
+            version = c.fetchone()[0]
+            if version == SCHEMA_VERSION:
+                self._refresh_stale_tables(conn)
+                return
+            if version > SCHEMA_VERSION:
+                raise RuntimeError(
+                    f"{self.db_path} has schema version {version}, newer than this code's {SCHEMA_VERSION}"
+                )
+
+            vacuum = False
+            for step_version, migrate in enumerate(self._migrations(), start=1):
+                if step_version <= version:
+                    continue
+                # Take the write lock first so concurrent upgrades run each step once
+                c.execute('BEGIN IMMEDIATE')
+                c.execute('PRAGMA user_version')
+                if c.fetchone()[0] >= step_version:
+                    conn.rollback()
+                    continue
+                try:
+                    vacuum = migrate(c) or vacuum
+                    c.execute(f'PRAGMA user_version = {step_version}')
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            if vacuum:
+                # Give the space held by dropped columns and indexes back to the filesystem
+                conn.execute('VACUUM')
+            self._refresh_stale_tables(conn)
+        finally:
+            conn.close()
+
+    def _migrations(self):
+        """Schema steps in order; step n takes the database to user_version n and returns True if a VACUUM is worthwhile"""
+        # Append new steps and bump SCHEMA_VERSION; never edit a released one
+        return [
+            self._create_base_tables,
+            self._migrate_transcript_storage,
+            self._migrate_video_columns,
+            self._migrate_bible_summaries,
+            self._setup_facets,
+            self._migrate_video_search,
+            self._migrate_search_prefixes,
+            self._setup_search_terms,
+            self._migrate_bible_stats_triggers,
+            self._setup_generation_triggers,
+            self._setup_database_id,
+        ]
+
+    def _create_base_tables(self, c):
+        """Step 1: the core tables and their original indexes"""
+        # Generation counter bumped by every ingest, used to invalidate cached searches
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS database_info (
+                key TEXT PRIMARY KEY,
+                value INTEGER
+            )
+        ''')
+        c.execute("INSERT OR IGNORE INTO database_info (key, value) VALUES ('generation', 0)")
         
         # Create tables
         c.execute('''
@@ -27,7 +209,9 @@ class TranscriptManager:
                 title TEXT,
                 duration INTEGER,
                 url TEXT,
-                date_published TEXT
+                date_published TEXT,
+                published_on TEXT,
+                speaker TEXT
             )
         ''')
         
@@ -38,16 +222,10 @@ class TranscriptManager:
                 start_time REAL,
                 end_time REAL,
                 text TEXT,
-                vimeo_url TEXT,
                 FOREIGN KEY (video_id) REFERENCES videos (video_id)
             )
         ''')
-        
-        # Create full-text search index
-        c.execute('''
-            CREATE VIRTUAL TABLE IF NOT EXISTS transcript_search 
-            USING fts5(video_id, start_time, end_time, text, vimeo_url)
-        ''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_segments_video ON transcript_segments(video_id, start_time)')
         
         # Create Bible references table
         c.execute('''
@@ -67,7 +245,6 @@ class TranscriptManager:
         
         # Create indexes for Bible references
         c.execute('CREATE INDEX IF NOT EXISTS idx_bible_book ON bible_references(book)')
-        c.execute('CREATE INDEX IF NOT EXISTS idx_bible_chapter ON bible_references(book, chapter)')
         c.execute('CREATE INDEX IF NOT EXISTS idx_bible_video ON bible_references(video_id)')
         
         # Create theological topics table
@@ -87,27 +264,395 @@ class TranscriptManager:
         # Create indexes for topics
         c.execute('CREATE INDEX IF NOT EXISTS idx_topic ON theological_topics(topic)')
         c.execute('CREATE INDEX IF NOT EXISTS idx_topic_video ON theological_topics(video_id)')
+        return False
+
+    def _migrate_transcript_storage(self, c):
+        """Step 2: drop stored URLs, text-only search index, transcript file manifest"""
+        migrated = self._drop_stored_urls(c)
+        
+        # Manifest of ingested transcript files, used to skip unchanged ones
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS transcript_files (
+                video_id TEXT PRIMARY KEY,
+                file_name TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                content_hash TEXT,
+                FOREIGN KEY (video_id) REFERENCES videos (video_id)
+            )
+        ''')
         
-        conn.commit()
-        conn.close()
+        # Create full-text search index
+        return self._setup_search_index(c) or migrated
+
+    def _migrate_video_columns(self, c):
+        """Step 3: published_on and speaker columns on videos, indexed"""
+        self._add_published_on_column(c)
+        self._add_speaker_column(c)
+        c.execute('CREATE INDEX IF NOT EXISTS idx_videos_published ON videos(published_on)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_videos_speaker ON videos(speaker)')
+        return False
+
+    def _migrate_bible_summaries(self, c):
+        """Step 4: covering drill-down index and reference counts for the heat map"""
+        # Covers the heat map drill-down; replaces the older (book, chapter) index
+        c.execute('DROP INDEX IF EXISTS idx_bible_chapter')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_bible_chapter_video ON bible_references(book, chapter, video_id, start_time)')
+        self._setup_bible_stats(c)
+        return False
+
+    def _migrate_video_search(self, c):
+        """Step 6: description column on videos and the video_search title index"""
+        c.execute('PRAGMA table_info(videos)')
+        if 'description' not in [row[1] for row in c.fetchall()]:
+            c.execute('ALTER TABLE videos ADD COLUMN description TEXT')
+            c.execute('SELECT 1 FROM videos LIMIT 1')
+            catalog = VideoCatalog()
+            if c.fetchone() and catalog.exists():
+                print("Filling in video descriptions from video_data.json...")
+                c.executemany(
+                    'UPDATE videos SET description = ? WHERE video_id = ?',
+                    [(video.get('description'), video['id']) for video in catalog.videos]
+                )
+        c.execute(VIDEO_SEARCH_SQL)
+        self._refresh_video_search(c)
+        return False
+
+    def _migrate_search_prefixes(self, c):
+        """Step 7: rebuild both full-text indexes with prefix indexes"""
+        migrated = self._setup_search_index(c)
+        c.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'video_search'")
+        if "prefix=" not in c.fetchone()[0]:
+            c.execute('DROP TABLE video_search')
+            c.execute(VIDEO_SEARCH_SQL)
+            self._refresh_video_search(c)
+        return migrated
+
+    def _setup_search_terms(self, c):
+        """Step 8: search_terms, the vocabulary behind search box completions"""
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS search_terms (
+                term TEXT PRIMARY KEY,
+                sermons INTEGER,
+                segments INTEGER
+            ) WITHOUT ROWID
+        ''')
+        self._refresh_search_terms(c)
+        return False
+
+    def _refresh_search_terms(self, c):
+        """Rebuild search_terms with the number of sermons and segments each indexed word appears in"""
+        c.execute("CREATE VIRTUAL TABLE temp.transcript_vocab USING fts5vocab(main, transcript_search, 'instance')")
+        c.execute('CREATE TEMP TABLE segment_videos (id INTEGER PRIMARY KEY, video_id TEXT)')
+        try:
+            c.execute('INSERT INTO segment_videos SELECT id, video_id FROM transcript_segments')
+            c.execute('DELETE FROM search_terms')
+            c.execute('''
+                INSERT INTO search_terms (term, sermons, segments)
+                SELECT tv.term, COUNT(DISTINCT s.video_id), COUNT(DISTINCT tv.doc)
+                FROM temp.transcript_vocab AS tv
+                JOIN segment_videos AS s ON s.id = tv.doc
+                GROUP BY tv.term
+            ''')
+        finally:
+            c.execute('DROP TABLE temp.segment_videos')
+            c.execute('DROP TABLE temp.transcript_vocab')
 
+    def _migrate_bible_stats_triggers(self, c):
+        """Step 9: recreate the bible_reference_stats triggers with keyed cleanup and a NULL book guard"""
+        c.execute('DROP TRIGGER IF EXISTS bible_references_stats_ai')
+        c.execute('DROP TRIGGER IF EXISTS bible_references_stats_ad')
+        self._setup_bible_stats(c)
+        return False
+
+    def _setup_generation_triggers(self, c):
+        """Step 10: bump the generation whenever the extraction scripts change references or topics"""
+        for table in ('bible_references', 'theological_topics'):
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                c.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_generation_{event.lower()}
+                    AFTER {event} ON {table} BEGIN
+                        UPDATE database_info SET value = value + 1 WHERE key = 'generation';
+                    END
+                ''')
+        return False
+
+    def _setup_database_id(self, c):
+        """Step 11: a random id telling this database apart from a rebuilt one whose generation restarted at 0"""
+        c.execute("INSERT OR IGNORE INTO database_info (key, value) VALUES ('database_id', ?)", (secrets.randbits(63),))
+        return False
+
+    def _refresh_video_search(self, c):
+        """Rebuild video_search from videos (a few thousand rows, so a rebuild is cheap)"""
+        c.execute('DELETE FROM video_search')
+        c.execute('''
+            INSERT INTO video_search (title, description, video_id)
+            SELECT title, description, video_id FROM videos
+        ''')
+
+    def _drop_stored_urls(self, c):
+        """Drop the per-segment vimeo_url column older databases stored; returns True if it was dropped"""
+        c.execute('PRAGMA table_info(transcript_segments)')
+        if 'vimeo_url' not in [row[1] for row in c.fetchall()]:
+            return False
+        print("Dropping stored vimeo_url column from transcript_segments...")
+        # The old triggers copied vimeo_url into the search index
+        c.execute('DROP TRIGGER IF EXISTS transcript_segments_ad')
+        c.execute('DROP TRIGGER IF EXISTS transcript_segments_au')
+        c.execute('ALTER TABLE transcript_segments DROP COLUMN vimeo_url')
+        return True
+
+    def _add_published_on_column(self, c):
+        """Add the YYYY-MM-DD published_on column to older databases"""
+        c.execute('PRAGMA table_info(videos)')
+        if 'published_on' in [row[1] for row in c.fetchall()]:
+            return
+        print("Adding published_on column to videos...")
+        c.execute('ALTER TABLE videos ADD COLUMN published_on TEXT')
+        # date_published is an ISO timestamp, so its date is the first ten characters
+        c.execute('UPDATE videos SET published_on = substr(date_published, 1, 10)')
+
+    def _add_speaker_column(self, c):
+        """Add the speaker column to older databases and fill it from video_data.json"""
+        c.execute('PRAGMA table_info(videos)')
+        if 'speaker' in [row[1] for row in c.fetchall()]:
+            return
+        print("Adding speaker column to videos...")
+        c.execute('ALTER TABLE videos ADD COLUMN speaker TEXT')
+        catalog = VideoCatalog()
+        if catalog.exists():
+            self._update_speakers(c, catalog.videos)
+
+    def _update_speakers(self, c, videos):
+        """Store the speaker extracted from each video_data.json entry's description"""
+        c.executemany(
+            'UPDATE videos SET speaker = ? WHERE video_id = ?',
+            [(extract_speaker(video.get('description')), video['id']) for video in videos]
+        )
+
+    def update_speakers(self, videos):
+        """Re-extract speakers for already ingested videos, e.g. after descriptions change"""
+        self._check_writable()
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        try:
+            self._update_speakers(c, videos)
+            self._refresh_facets(c)
+            self._refresh_bible_stats(c)
+            self._bump_generation(c)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _setup_search_index(self, c):
+        """Create the transcript_search FTS index over transcript_segments; returns True if an old index was rebuilt"""
+        c.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transcript_search'")
+        row = c.fetchone()
+        migrated = False
+        if row and ' '.join(row[0].split()) != ' '.join(SEARCH_INDEX_SQL.split()):
+            print("Rebuilding transcript_search with its current definition...")
+            c.execute('DROP TABLE transcript_search')
+            c.execute('DROP TRIGGER IF EXISTS transcript_segments_ad')
+            c.execute('DROP TRIGGER IF EXISTS transcript_segments_au')
+            row = None
+            migrated = True
+
+        if row is None:
+            c.execute(SEARCH_INDEX_SQL)
+            c.execute("INSERT INTO transcript_search(transcript_search) VALUES ('rebuild')")
+
+        # Keep the index in sync when segments are deleted or edited. New
+        # segments are indexed in batches by _insert_segments instead of a
+        # per-row insert trigger, which makes bulk loads several times slower.
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS transcript_segments_ad AFTER DELETE ON transcript_segments BEGIN
+                INSERT INTO transcript_search (transcript_search, rowid, text)
+                VALUES ('delete', old.id, old.text);
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS transcript_segments_au AFTER UPDATE OF text ON transcript_segments BEGIN
+                INSERT INTO transcript_search (transcript_search, rowid, text)
+                VALUES ('delete', old.id, old.text);
+                INSERT INTO transcript_search (rowid, text) VALUES (new.id, new.text);
+            END
+        ''')
+        return migrated
+
+
+    def _setup_facets(self, c):
+        """Create the video_facets table and the triggers that keep book and topic facets current"""
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'video_facets'")
+        exists = c.fetchone() is not None
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS video_facets (
+                facet TEXT,
+                value TEXT,
+                video_id TEXT,
+                PRIMARY KEY (facet, value, video_id)
+            ) WITHOUT ROWID
+        ''')
+
+        for facet, table, column in (('book', 'bible_references', 'book'), ('topic', 'theological_topics', 'topic')):
+            c.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_facet_ai AFTER INSERT ON {table} BEGIN
+                    INSERT OR IGNORE INTO video_facets (facet, value, video_id)
+                    VALUES ('{facet}', new.{column}, new.video_id);
+                END
+            ''')
+            c.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_facet_ad AFTER DELETE ON {table} BEGIN
+                    DELETE FROM video_facets
+                    WHERE facet = '{facet}' AND value = old.{column} AND video_id = old.video_id
+                    AND NOT EXISTS (
+                        SELECT 1 FROM {table} WHERE video_id = old.video_id AND {column} = old.{column}
+                    );
+                END
+            ''')
+
+        if not exists:
+            self._refresh_facets(c)
+
+    def _setup_bible_stats(self, c):
+        """Create bible_reference_stats and the triggers that keep it in step with bible_references"""
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bible_reference_stats'")
+        exists = c.fetchone() is not None
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS bible_reference_stats (
+                book TEXT,
+                chapter INTEGER,
+                year INTEGER,
+                speaker TEXT,
+                count INTEGER,
+                PRIMARY KEY (book, chapter, year, speaker)
+            ) WITHOUT ROWID
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS bible_references_stats_ai AFTER INSERT ON bible_references BEGIN
+                INSERT INTO bible_reference_stats (book, chapter, year, speaker, count)
+                SELECT new.book, COALESCE(new.chapter, 0),
+                    COALESCE(CAST(substr(v.published_on, 1, 4) AS INTEGER), 0), COALESCE(v.speaker, ''), 1
+                FROM (SELECT 1) LEFT JOIN videos AS v ON v.video_id = new.video_id
+                WHERE new.book IS NOT NULL
+                ON CONFLICT (book, chapter, year, speaker) DO UPDATE SET count = count + 1;
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS bible_references_stats_ad AFTER DELETE ON bible_references BEGIN
+                UPDATE bible_reference_stats SET count = count - 1
+                WHERE book = old.book AND chapter = COALESCE(old.chapter, 0)
+                AND (year, speaker) = (
+                    SELECT COALESCE(CAST(substr(v.published_on, 1, 4) AS INTEGER), 0), COALESCE(v.speaker, '')
+                    FROM (SELECT 1) LEFT JOIN videos AS v ON v.video_id = old.video_id
+                );
+                DELETE FROM bible_reference_stats
+                WHERE book = old.book AND chapter = COALESCE(old.chapter, 0)
+                AND (year, speaker) = (
+                    SELECT COALESCE(CAST(substr(v.published_on, 1, 4) AS INTEGER), 0), COALESCE(v.speaker, '')
+                    FROM (SELECT 1) LEFT JOIN videos AS v ON v.video_id = old.video_id
+                )
+                AND count <= 0;
+            END
+        ''')
+
+        if not exists:
+            self._refresh_bible_stats(c)
+
+    def _refresh_bible_stats(self, c):
+        """Rebuild bible_reference_stats from bible_references and videos"""
+        c.execute('DELETE FROM bible_reference_stats')
+        c.execute('''
+            INSERT INTO bible_reference_stats (book, chapter, year, speaker, count)
+            SELECT br.book, COALESCE(br.chapter, 0),
+                COALESCE(CAST(substr(v.published_on, 1, 4) AS INTEGER), 0), COALESCE(v.speaker, ''), COUNT(*)
+            FROM bible_references AS br
+            LEFT JOIN videos AS v ON v.video_id = br.video_id
+            WHERE br.book IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ''')
+
+    def refresh_bible_stats(self):
+        """Rebuild the heat map's Bible reference counts, e.g. after bulk edits made with triggers disabled"""
+        self._check_writable()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            c = conn.cursor()
+            self._refresh_bible_stats(c)
+            self._bump_generation(c)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _refresh_facets(self, c):
+        """Rebuild video_facets from videos, bible_references and theological_topics"""
+        c.execute('DELETE FROM video_facets')
+        c.execute('''
+            INSERT INTO video_facets (facet, value, video_id)
+            SELECT 'speaker', COALESCE(speaker, ''), video_id FROM videos AS v
+            WHERE EXISTS (SELECT 1 FROM transcript_segments AS s WHERE s.video_id = v.video_id)
+        ''')
+        c.execute('''
+            INSERT INTO video_facets (facet, value, video_id)
+            SELECT 'year', substr(published_on, 1, 4), video_id FROM videos AS v
+            WHERE published_on IS NOT NULL AND published_on != ''
+            AND EXISTS (SELECT 1 FROM transcript_segments AS s WHERE s.video_id = v.video_id)
+        ''')
+        c.execute('''
+            INSERT OR IGNORE INTO video_facets (facet, value, video_id)
+            SELECT 'book', book, video_id FROM bible_references WHERE book IS NOT NULL
+        ''')
+        c.execute('''
+            INSERT OR IGNORE INTO video_facets (facet, value, video_id)
+            SELECT 'topic', topic, video_id FROM theological_topics WHERE topic IS NOT NULL
+        ''')
+
+    def _mark_derived_tables_stale(self, c):
+        """Record that videos changed without the tables derived from them being rebuilt"""
+        c.execute(f"INSERT OR REPLACE INTO database_info (key, value) VALUES ('{STALE_KEY}', 1)")
+
+    def _refresh_derived_tables(self, c):
+        """Rebuild the facet, Bible stats, title search and vocabulary tables and clear the stale mark"""
+        self._refresh_facets(c)
+        self._refresh_bible_stats(c)
+        self._refresh_video_search(c)
+        self._refresh_search_terms(c)
+        c.execute(f"UPDATE database_info SET value = 0 WHERE key = '{STALE_KEY}'")
+        self._bump_generation(c)
+
+    def _refresh_stale_tables(self, conn):
+        """Rebuild the derived tables if they were marked stale, committing the result"""
+        c = conn.cursor()
+        c.execute(f"SELECT value FROM database_info WHERE key = '{STALE_KEY}'")
+        row = c.fetchone()
+        if row and row[0]:
+            print("Rebuilding the Video List, heat map and search tables...")
+            self._refresh_derived_tables(c)
+            conn.commit()
+
+    def refresh_derived_tables(self):
+        """Rebuild the tables derived from videos if add_video calls have left them stale"""
+        self._check_writable()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self._refresh_stale_tables(conn)
+        finally:
+            conn.close()
+
+    def refresh_facets(self):
+        """Rebuild the Video List facets, e.g. after bulk edits made with triggers disabled"""
+        self._check_writable()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            c = conn.cursor()
+            self._refresh_facets(c)
+            self._bump_generation(c)
+            conn.commit()
+        finally:
+            conn.close()
 
     def _timestamp_to_seconds(self, timestamp):
         """Convert VTT timestamp to seconds"""
-        try:
-            parts = timestamp.split(':')
-            if len(parts) == 3:
-                h, m, s = parts
-                return float(h) * 3600 + float(m) * 60 + float(s)
-            elif len(parts) == 2: # Handle MM:SS.mmm
-                m, s = parts
-                return float(m) * 60 + float(s)
-            else:
-                # Fallback or error for unexpected format
-                return 0.0 # Or raise an error
-        except ValueError:
-             # Handle cases like "WEBVTT" or other non-timestamp lines if webvtt library doesn't filter them
-            return 0.0 # Or raise an error
+        return timestamp_to_seconds(timestamp)
 
 
     def _format_timestamp(self, seconds):
@@ -126,153 +671,704 @@ class TranscriptManager:
             return "00:00:00"
 
     def add_video(self, video_data, vtt_file):
-        """Add video and its transcript to database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        try:
-            # Add video info
-            c.execute('''
-                INSERT OR REPLACE INTO videos 
-                (video_id, title, duration, url, date_published)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                video_data['id'],
-                video_data['title'],
-                video_data['duration'],
-                video_data['url'],
-                video_data['date']
-            ))
-            
-            # Parse and add transcript segments
-            for caption in webvtt.read(vtt_file):
-                start_time = self._timestamp_to_seconds(caption.start)
-                end_time = self._timestamp_to_seconds(caption.end)
-                
-                # Use player.vimeo.com to avoid spam check
-                video_id = video_data['url'].split('/')[-1]
-                vimeo_url = f"https://player.vimeo.com/video/{video_id}#t={int(start_time)}s"
-                
-                # Add to main table
-                c.execute('''
-                    INSERT INTO transcript_segments 
-                    (video_id, start_time, end_time, text, vimeo_url)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    video_data['id'],
-                    start_time,
-                    end_time,
-                    caption.text,
-                    vimeo_url
-                ))
-                
-                # Add to search index
-                c.execute('''
-                    INSERT INTO transcript_search 
-                    (video_id, start_time, end_time, text, vimeo_url)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    video_data['id'],
-                    str(start_time), # FTS5 stores everything as text
-                    str(end_time),
-                    caption.text,
-                    vimeo_url
-                ))
-            
+        """Add video and its transcript to database, replacing any earlier copy"""
+        # The derived tables are rebuilt once by refresh_derived_tables(), not per video
+        stats = self.add_videos([(video_data, vtt_file)], force=True, report=False, refresh_derived=False)
+        return not stats['failed']
+
+    def _get_version(self, c):
+        """Read (database id, generation), which together identify the data served"""
+        c.execute("SELECT key, value FROM database_info WHERE key IN ('database_id', 'generation')")
+        info = dict(c.fetchall())
+        return info.get('database_id', 0), info.get('generation', 0)
+
+    def _bump_generation(self, c):
+        """Mark the database as changed so cached searches are not reused"""
+        c.execute("UPDATE database_info SET value = value + 1 WHERE key = 'generation'")
+
+    def get_version(self):
+        """Get (database id, generation), which changes whenever the data served from it changes"""
+        with self.pool.cursor() as c:
+            return self._get_version(c)
+
+    def get_transcript_manifest(self):
+        """Get {video_id: (size, mtime_ns, content_hash)} for ingested transcript files"""
+        with self.pool.cursor() as c:
+            try:
+                c.execute('SELECT video_id, size, mtime_ns, content_hash FROM transcript_files')
+                return {row[0]: tuple(row[1:]) for row in c.fetchall()}
+            except Exception as e:
+                print(f"Error getting transcript manifest: {e}")
+                return {}
+
+    def stale_transcripts(self, videos):
+        """Filter (video_data, vtt_file) pairs down to files not ingested with their current size and mtime"""
+        manifest = self.get_transcript_manifest()
+        stale = []
+        for video_data, vtt_file in videos:
+            known = manifest.get(video_data.get('id'))
+            if known:
+                try:
+                    stat = os.stat(vtt_file)
+                except OSError:
+                    stale.append((video_data, vtt_file))
+                    continue
+                if (stat.st_size, stat.st_mtime_ns) == known[:2]:
+                    continue
+            stale.append((video_data, vtt_file))
+        return stale
+
+    def _insert_segments(self, c, segment_rows):
+        """Write one batch of transcript rows with executemany and index them"""
+        c.execute('SELECT COALESCE(MAX(id), 0) FROM transcript_segments')
+        last_id = c.fetchone()[0]
+        c.executemany('''
+            INSERT INTO transcript_segments 
+            (video_id, start_time, end_time, text)
+            VALUES (?, ?, ?, ?)
+        ''', segment_rows)
+        c.execute('''
+            INSERT INTO transcript_search (rowid, text)
+            SELECT id, text FROM transcript_segments WHERE id > ?
+        ''', (last_id,))
+
+    def _delete_segments(self, c, video_id):
+        """Remove a video's transcript rows before it is re-ingested (a trigger unindexes them)"""
+        c.execute('DELETE FROM transcript_segments WHERE video_id = ?', (video_id,))
+
+    def add_videos(self, videos, force=False, **kwargs):
+        """Bulk add (video_data, vtt_file) pairs, skipping files the manifest already has unless `force` is set"""
+        self._check_writable()
+        if not force:
+            videos = self.stale_transcripts(videos)
+            if not videos:
+                return {'videos': 0, 'segments': 0, 'unchanged': 0, 'failed': [], 'seconds': 0.0, 'rows_per_sec': 0.0}
+        parse_failures = []
+
+        def parsed_videos():
+            for video_data, vtt_file in videos:
+                try:
+                    fingerprint = transcript_fingerprint(vtt_file)
+                    captions = parse_vtt(vtt_file)
+                except Exception as e:
+                    print(f"Error adding video {video_data.get('id', 'Unknown ID')} with VTT file {vtt_file}: {e}")
+                    parse_failures.append(video_data.get('id'))
+                    continue
+                yield video_data, captions, (Path(vtt_file).name,) + fingerprint
+
+        stats = self.add_parsed_videos(parsed_videos(), force=force, **kwargs)
+        stats['failed'] = parse_failures + stats['failed']
+        return stats
+
+    def add_parsed_videos(self, parsed_videos, force=False, batch_size=10000, videos_per_transaction=50, report=True,
+                          refresh_derived=True):
+        """Bulk add (video_data, captions, source) triples, many videos per transaction; returns load statistics"""
+        self._check_writable()
+        stats = {'videos': 0, 'segments': 0, 'unchanged': 0, 'failed': [], 'seconds': 0.0, 'rows_per_sec': 0.0}
+        segment_rows = []
+        pending_videos = []
+        started = time.perf_counter()
+
+        def flush():
+            if segment_rows:
+                self._insert_segments(c, segment_rows)
+                segment_rows.clear()
+
+        def commit():
+            flush()
+            if pending_videos:
+                self._bump_generation(c)
+                self._mark_derived_tables_stale(c)
             conn.commit()
-            return True
-            
-        except Exception as e:
-            print(f"Error adding video {video_data.get('id', 'Unknown ID')} with VTT file {vtt_file}: {e}")
+            for video_id, segment_count in pending_videos:
+                stats['videos'] += 1
+                stats['segments'] += segment_count
+            pending_videos.clear()
+
+        def abandon(error):
+            """Roll back the open transaction and report its videos as failed"""
+            print(f"Error bulk adding videos: {error}")
             conn.rollback()
-            return False
+            stats['failed'].extend(video_id for video_id, _ in pending_videos)
+            pending_videos.clear()
+            segment_rows.clear()
+
+        conn = None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            for pragma in BULK_LOAD_PRAGMAS:
+                conn.execute(pragma)
+            c = conn.cursor()
+
+            c.execute('SELECT video_id FROM videos')
+            existing_ids = set(row[0] for row in c.fetchall())
+            c.execute('SELECT video_id, content_hash FROM transcript_files')
+            known_hashes = dict(c.fetchall())
+
+            try:
+                for video_data, captions, source in parsed_videos:
+                    video_id = video_data.get('id')
+                    if source and not force and known_hashes.get(video_id) == source[3]:
+                        # Touched but not modified: just record the new size and mtime
+                        c.execute(
+                            'UPDATE transcript_files SET file_name = ?, size = ?, mtime_ns = ? WHERE video_id = ?',
+                            (source[0], source[1], source[2], video_id)
+                        )
+                        stats['unchanged'] += 1
+                        continue
+
+                    try:
+                        video_row = (
+                            video_data['id'],
+                            video_data['title'],
+                            video_data['duration'],
+                            video_data['url'],
+                            video_data['date'],
+                            published_on(video_data['date']),
+                            extract_speaker(video_data.get('description')),
+                            video_data.get('description')
+                        )
+                        rows = [(video_id, start_time, end_time, text) for start_time, end_time, text in captions]
+                    except KeyError as e:
+                        print(f"Error adding video {video_data.get('id', 'Unknown ID')}: missing {e}")
+                        stats['failed'].append(video_id)
+                        continue
+                    except (TypeError, ValueError) as e:
+                        print(f"Error adding video {video_id}: malformed captions ({e})")
+                        stats['failed'].append(video_id)
+                        continue
+
+                    # A savepoint lets one video's rows be undone without losing the rest of the batch
+                    if not conn.in_transaction:
+                        c.execute('BEGIN')
+                    c.execute('SAVEPOINT add_video')
+                    try:
+                        if video_id in existing_ids:
+                            self._delete_segments(c, video_id)
+
+                        # Add video info
+                        c.execute('''
+                            INSERT OR REPLACE INTO videos 
+                            (video_id, title, duration, url, date_published, published_on, speaker, description)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', video_row)
+
+                        if source:
+                            c.execute('''
+                                INSERT OR REPLACE INTO transcript_files
+                                (video_id, file_name, size, mtime_ns, content_hash)
+                                VALUES (?, ?, ?, ?, ?)
+                            ''', (video_id,) + tuple(source))
+                    except sqlite3.Error as e:
+                        c.execute('ROLLBACK TO add_video')
+                        c.execute('RELEASE add_video')
+                        print(f"Error adding video {video_id}: {e}")
+                        stats['failed'].append(video_id)
+                        continue
+                    c.execute('RELEASE add_video')
+                    existing_ids.add(video_id)
+
+                    segment_rows.extend(rows)
+                    pending_videos.append((video_id, len(rows)))
+                    try:
+                        if len(segment_rows) >= batch_size:
+                            flush()
+                        if len(pending_videos) >= videos_per_transaction:
+                            commit()
+                    except sqlite3.Error as e:
+                        # Segment rows are written for many videos at once, so the whole batch fails
+                        abandon(e)
+
+                commit()
+            except Exception as e:
+                abandon(e)
+
+            # Batches committed before a failure must still reach the derived tables
+            if stats['videos'] and refresh_derived:
+                try:
+                    self._refresh_derived_tables(c)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    print(f"Error refreshing search tables: {e}")
+                    conn.rollback()
+        except sqlite3.Error as e:
+            # Raised while opening the database, before anything was loaded
+            print(f"Error opening {self.db_path} for loading: {e}")
+            stats['failed'].extend(video_data.get('id') for video_data, _, _ in parsed_videos)
         finally:
-            conn.close()
+            if conn is not None:
+                try:
+                    # Leave a single-file database behind so it can be shipped as-is
+                    conn.execute('PRAGMA journal_mode = DELETE')
+                except sqlite3.Error as e:
+                    print(f"Could not switch {self.db_path} back from WAL: {e}")
+                conn.close()
+
+        stats['seconds'] = time.perf_counter() - started
+        if stats['seconds'] > 0:
+            stats['rows_per_sec'] = stats['segments'] / stats['seconds']
+        if report:
+            print(f"Added {stats['videos']} videos ({stats['segments']:,} segments) "
+                  f"in {stats['seconds']:.2f}s - {stats['rows_per_sec']:,.0f} rows/sec"
+                  f" ({stats['unchanged']} unchanged)")
+        return stats
 
     def get_processed_video_ids(self):
         """Get list of video IDs that have already been processed"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        with self.pool.cursor() as c:
+            try:
+                c.execute('SELECT video_id FROM videos')
+                return set(row[0] for row in c.fetchall())
+            except Exception as e:
+                print(f"Error getting processed video IDs: {e}")
+                return set()
+
+    def get_segment_count(self):
+        """Get the number of transcript segments in the database"""
+        with self.pool.cursor() as c:
+            try:
+                c.execute('SELECT COUNT(*) FROM transcript_segments')
+                return c.fetchone()[0]
+            except Exception as e:
+                print(f"Error counting transcript segments: {e}")
+                return 0
+
+    def get_speakers(self, with_bible_references=False):
+        """Get the sorted names of every speaker, optionally only those with Bible references"""
+        with self.pool.cursor() as c:
+            try:
+                if with_bible_references:
+                    c.execute('''
+                        SELECT DISTINCT speaker FROM videos
+                        WHERE speaker IS NOT NULL
+                        AND video_id IN (SELECT video_id FROM bible_references)
+                        ORDER BY speaker
+                    ''')
+                else:
+                    c.execute('SELECT DISTINCT speaker FROM videos WHERE speaker IS NOT NULL ORDER BY speaker')
+                return [row[0] for row in c.fetchall()]
+            except Exception as e:
+                print(f"Error getting speakers: {e}")
+                return []
+
+    def _facet_filter(self, filters, column):
+        """Build `AND column IN (...)` clauses and parameters for the active facet filters"""
+        clause = ''
+        params = []
+        for facet, value in filters.items():
+            if value is None:
+                continue
+            clause += f' AND {column} IN (SELECT video_id FROM video_facets WHERE facet = ? AND value = ?)'
+            params.extend((facet, str(value)))
+        return clause, params
+
+    def filter_videos(self, speaker=None, year=None, book=None, topic=None):
+        """Get the transcribed videos matching every given filter, newest first; speaker='' means no known speaker"""
+        filters = {'speaker': speaker, 'year': year, 'book': book, 'topic': topic}
+        facet_filter, params = self._facet_filter(filters, 'v.video_id')
+        with self.pool.cursor() as c:
+            try:
+                # Every transcribed video has exactly one speaker facet row
+                c.execute(f'''
+                    SELECT v.video_id, v.title, v.duration, v.published_on, v.speaker
+                    FROM videos AS v
+                    WHERE v.video_id IN (SELECT video_id FROM video_facets WHERE facet = 'speaker'){facet_filter}
+                    ORDER BY v.date_published DESC
+                ''', params)
+                columns = [column[0] for column in c.description]
+                return [dict(zip(columns, row)) for row in c.fetchall()]
+            except Exception as e:
+                print(f"Error filtering videos: {e}")
+                return []
+
+    def get_facet_counts(self, speaker=None, year=None, book=None, topic=None):
+        """Get {facet: {value: count}}, counting each facet under every filter except its own"""
+        filters = {'speaker': speaker, 'year': year, 'book': book, 'topic': topic}
+        clause = ''
+        params = []
+        for facet, value in filters.items():
+            if value is None:
+                continue
+            clause += ' AND (f.facet = ? OR f.video_id IN (SELECT video_id FROM video_facets WHERE facet = ? AND value = ?))'
+            params.extend((facet, facet, str(value)))
+
+        counts = {facet: {} for facet in FACETS}
+        with self.pool.cursor() as c:
+            try:
+                c.execute(f'''
+                    SELECT f.facet, f.value, COUNT(*)
+                    FROM video_facets AS f
+                    WHERE 1=1{clause}
+                    GROUP BY f.facet, f.value
+                ''', params)
+                for facet, value, count in c:
+                    counts.setdefault(facet, {})[value] = count
+            except Exception as e:
+                print(f"Error getting facet counts: {e}")
+        return counts
+
+    def _load_term_index(self):
+        """Return the TermIndex for the current database version, reading search_terms if it changed"""
+        with self.pool.cursor() as c:
+            version = self._get_version(c)
+            if self._term_index is not None and version == self._term_index_version:
+                return self._term_index
+            with self._term_index_lock:
+                if self._term_index is None or version != self._term_index_version:
+                    c.execute('SELECT term, sermons, segments FROM search_terms')
+                    self._term_index = TermIndex(c.fetchall())
+                    self._term_index_version = version
+                return self._term_index
+
+    def suggest(self, text, limit=8):
+        """Get up to `limit` (term, sermons) completions of the last word of `text`, most widespread first"""
+        words = WORD.findall(text)
+        if not words or text[-1:].isspace():
+            return []
         try:
-            c.execute('SELECT video_id FROM videos')
-            return set(row[0] for row in c.fetchall())
-        except Exception as e:
-            print(f"Error getting processed video IDs: {e}")
-            return set()
-        finally:
-            conn.close()
+            return self._load_term_index().complete(words[-1].lower(), limit)
+        except sqlite3.Error as e:
+            print(f"Error loading search suggestions: {e}")
+            return []
 
-    def search_transcripts(self, query, context_size=2, search_titles=True):
-        """Search transcripts and video titles, return matches with context"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+    def _bible_stats_filter(self, year, speaker):
+        """Build a WHERE clause and parameters for bible_reference_stats"""
+        clause = 'WHERE 1=1'
+        params = []
+        if year is not None:
+            clause += ' AND year = ?'
+            params.append(int(year))
+        if speaker is not None:
+            clause += ' AND speaker = ?'
+            params.append(speaker)
+        return clause, params
+
+    def get_book_counts(self, year=None, speaker=None):
+        """Get [(book, references)] for the heat map, most referenced first"""
+        clause, params = self._bible_stats_filter(year, speaker)
+        with self.pool.cursor() as c:
+            try:
+                c.execute(f'''
+                    SELECT book, SUM(count) AS references_count
+                    FROM bible_reference_stats
+                    {clause}
+                    GROUP BY book
+                    ORDER BY references_count DESC
+                ''', params)
+                return c.fetchall()
+            except Exception as e:
+                print(f"Error getting Bible book counts: {e}")
+                return []
+
+    def get_chapter_counts(self, book, year=None, speaker=None):
+        """Get [(chapter, references)] for one book in chapter order; chapter is None for general mentions"""
+        clause, params = self._bible_stats_filter(year, speaker)
+        with self.pool.cursor() as c:
+            try:
+                c.execute(f'''
+                    SELECT NULLIF(chapter, 0), SUM(count)
+                    FROM bible_reference_stats
+                    {clause} AND book = ?
+                    GROUP BY chapter
+                    ORDER BY chapter
+                ''', params + [book])
+                return c.fetchall()
+            except Exception as e:
+                print(f"Error getting Bible chapter counts: {e}")
+                return []
+
+    def get_verse_counts(self, book):
+        """Get [(chapter, verse_start, verse_end, references)] for one book, in verse order"""
+        with self.pool.cursor() as c:
+            try:
+                c.execute('''
+                    SELECT chapter, verse_start, verse_end, COUNT(*) as count
+                    FROM bible_references
+                    WHERE book = ?
+                    GROUP BY chapter, verse_start, verse_end
+                    ORDER BY chapter, verse_start
+                ''', (book,))
+                return c.fetchall()
+            except Exception as e:
+                print(f"Error getting verse counts for {book}: {e}")
+                return []
+
+    def get_chapter_sermons(self, book, limit=10):
+        """Get {chapter: [(title, video_id, start_time)]} with the newest `limit` references per chapter"""
+        with self.pool.cursor() as c:
+            try:
+                c.execute('''
+                    WITH refs AS (
+                        SELECT DISTINCT chapter, video_id, start_time
+                        FROM bible_references
+                        WHERE book = ?
+                    ),
+                    ranked AS (
+                        SELECT 
+                            r.chapter,
+                            v.title,
+                            r.video_id,
+                            r.start_time,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY r.chapter ORDER BY v.date_published DESC, r.start_time
+                            ) AS position
+                        FROM refs AS r
+                        JOIN videos AS v ON v.video_id = r.video_id
+                    )
+                    SELECT chapter, title, video_id, start_time
+                    FROM ranked
+                    WHERE position <= ?
+                    ORDER BY chapter, position
+                ''', (book, limit))
+                sermons = {}
+                for chapter, title, video_id, start_time in c:
+                    sermons.setdefault(chapter, []).append((title, video_id, start_time))
+                return sermons
+            except Exception as e:
+                print(f"Error getting sermons for {book}: {e}")
+                return {}
+
+    def _transcript_result(self, title, video_id, start_time, text, speaker=None, published=None):
+        """Build the result dict for a transcript match"""
+        url = vimeo_player_url(video_id, start_time)
+        return {
+            'title': title,
+            'video_id': video_id,
+            'speaker': speaker,
+            'published_on': published,
+            'timestamp': self._format_timestamp(start_time),
+            'url': url,
+            'match': text,
+            'match_type': 'transcript',
+            'context': [(text, start_time, url)]
+        }
+
+    def _add_context(self, c, results, context_size):
+        """Fill in each transcript result's context with the `context_size` cues either side of it"""
+        results = [r for r in results if r['match_type'] == 'transcript']
+        if context_size <= 0 or not results:
+            return
+
+        for chunk_start in range(0, len(results), CONTEXT_CHUNK_SIZE):
+            chunk = results[chunk_start:chunk_start + CONTEXT_CHUNK_SIZE]
+            values = ', '.join(['(?, ?, ?)'] * len(chunk))
+            params = []
+            for i, result in enumerate(chunk):
+                params.extend((i, result['video_id'], result['context'][0][1]))
+
+            c.execute(f'''
+                WITH hits (hit, video_id, start_time) AS (VALUES {values})
+                SELECT h.hit, s.video_id, s.start_time, s.text
+                FROM hits AS h
+                JOIN transcript_segments AS s
+                    ON s.video_id = h.video_id
+                    AND s.start_time >= COALESCE((
+                        SELECT p.start_time FROM transcript_segments AS p
+                        WHERE p.video_id = h.video_id AND p.start_time <= h.start_time
+                        ORDER BY p.start_time DESC LIMIT 1 OFFSET ?
+                    ), h.start_time - 1e9)
+                    AND s.start_time <= COALESCE((
+                        SELECT n.start_time FROM transcript_segments AS n
+                        WHERE n.video_id = h.video_id AND n.start_time >= h.start_time
+                        ORDER BY n.start_time LIMIT 1 OFFSET ?
+                    ), h.start_time + 1e9)
+                ORDER BY h.hit, s.start_time
+            ''', params + [context_size, context_size])
+
+            windows = [[] for _ in chunk]
+            for hit, video_id, start_time, text in c:
+                windows[hit].append((text, start_time, vimeo_player_url(video_id, start_time)))
+            for result, window in zip(chunk, windows):
+                if window:
+                    result['context'] = window
+
+    def _search_titles(self, c, query, match_query, date_filter='', date_params=()):
+        """Get result dicts for videos whose title or description matches, best first"""
+        title_weight, description_weight = VIDEO_SEARCH_WEIGHTS
+        c.execute(f'''
+            SELECT 
+                v.title,
+                v.url,
+                v.video_id,
+                v.speaker,
+                v.published_on,
+                highlight(video_search, 0, char(2), char(3)) != v.title AS title_matched
+            FROM video_search
+            JOIN videos AS v ON v.video_id = video_search.video_id
+            WHERE video_search MATCH ?{date_filter}
+            ORDER BY bm25(video_search, ?, ?)
+        ''', (match_query,) + date_params + (title_weight, description_weight))
         
         results = []
-        try:
-            # First, search in transcript text
-            c.execute('''
-                SELECT 
-                    v.title,
-                    ts_search.start_time, 
-                    ts_search.text, 
-                    ts_search.vimeo_url,
-                    'transcript' as match_type
-                FROM transcript_search AS ts_search
-                JOIN videos AS v ON ts_search.video_id = v.video_id
-                WHERE ts_search.text MATCH ?
-                ORDER BY v.title, CAST(ts_search.start_time AS REAL)
-            ''', (query,))
-            
-            transcript_matches = c.fetchall()
-            
-            # Process transcript matches
-            for match in transcript_matches:
-                title, start_time_str, text, url, match_type = match
-                start_time_float = float(start_time_str)
-                
-                results.append({
-                    'title': title,
-                    'timestamp': self._format_timestamp(start_time_float),
-                    'url': url,
-                    'match': text,
-                    'match_type': 'transcript',
-                    'context': [(text, start_time_float, url)]
-                })
-            
-            # If search_titles is enabled, also search video titles
-            if search_titles:
-                # Search for videos where title contains the query (case-insensitive)
+        for title, video_url, video_id, speaker, published, title_matched in c:
+            results.append({
+                'title': title,
+                'video_id': video_id,
+                'speaker': speaker,
+                'published_on': published,
+                'timestamp': '00:00:00',  # Start of video for title matches
+                'url': video_url,
+                'match': f"Title contains: '{query}'" if title_matched else f"Description mentions: '{query}'",
+                'match_type': 'title',
+                'context': [(f"Title match: {title}", 0, video_url)]
+            })
+        return results
+
+    def _date_filter(self, start_date, end_date):
+        """Build an `AND v.published_on ...` clause and its parameters for a date range"""
+        clause = ''
+        params = ()
+        if start_date:
+            clause += ' AND v.published_on >= ?'
+            params += (str(start_date),)
+        if end_date:
+            clause += ' AND v.published_on <= ?'
+            params += (str(end_date),)
+        return clause, params
+
+    def _segment_bounds(self, c, date_filter, date_params):
+        """Bound transcript_search.rowid to the segments of the videos in a narrow date range"""
+        c.execute(f'''
+            SELECT COUNT(*), (SELECT COUNT(*) FROM videos)
+            FROM videos AS v WHERE 1=1{date_filter}
+        ''', date_params)
+        in_range, total = c.fetchone()
+        if in_range * 4 > total:
+            return '', ()
+        c.execute(f'''
+            SELECT MIN(s.id), MAX(s.id)
+            FROM videos AS v
+            JOIN transcript_segments AS s ON s.video_id = v.video_id
+            WHERE 1=1{date_filter}
+        ''', date_params)
+        first_id, last_id = c.fetchone()
+        return ' AND transcript_search.rowid BETWEEN ? AND ?', (first_id or 0, last_id or 0)
+
+    def search(self, query, page=1, page_size=50, order='relevance', search_titles=True, context_size=2,
+               start_date=None, end_date=None, prefix=True, cancel=None):
+        """Search transcripts for one page of matches plus all title matches; returns None if `cancel` is set"""
+        if order not in SEARCH_ORDERS:
+            raise ValueError(f"Unknown search order {order!r}, expected one of {sorted(SEARCH_ORDERS)}")
+        page_size = int(page_size)
+        if page_size < 1:
+            raise ValueError(f"page_size must be at least 1, got {page_size}")
+        match_query = compile_query(query, prefix=prefix)
+        query = normalize_query(query)
+        page = max(1, int(page))
+        date_filter, date_params = self._date_filter(start_date, end_date)
+
+        response = {
+            'query': query,
+            'match_query': match_query,
+            'page': page,
+            'page_size': page_size,
+            'order': order,
+            'start_date': str(start_date) if start_date else None,
+            'end_date': str(end_date) if end_date else None,
+            'total': 0,
+            'results': [],
+            'title_results': []
+        }
+
+        if not match_query:
+            return response
+
+        with self.pool.cursor() as c:
+            if cancel is not None:
+                # A true return from the handler interrupts the running statement;
+                # the pool removes the handler when the connection is returned
+                c.connection.set_progress_handler(cancel.is_set, CANCEL_CHECK_INSTRUCTIONS)
+            try:
+                # The response echoes the typed query and quotes it in title labels, so key on both
+                cache_key = (self._get_version(c), query, match_query, page, page_size, order, search_titles,
+                             context_size, response['start_date'], response['end_date'])
+                cached = self.search_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+                if date_filter:
+                    bounds, bound_params = self._segment_bounds(c, date_filter, date_params)
+                    date_filter += bounds
+                    date_params += bound_params
+                    c.execute(f'''
+                        SELECT COUNT(*)
+                        FROM transcript_search
+                        JOIN transcript_segments AS s ON s.id = transcript_search.rowid
+                        JOIN videos AS v ON s.video_id = v.video_id
+                        WHERE transcript_search MATCH ?{date_filter}
+                    ''', (match_query,) + date_params)
+                else:
+                    c.execute('SELECT COUNT(*) FROM transcript_search WHERE transcript_search MATCH ?', (match_query,))
+                response['total'] = c.fetchone()[0]
+
+                offset = (page - 1) * page_size
+                if offset < response['total']:
+                    c.execute(f'''
+                        SELECT 
+                            v.title,
+                            s.video_id,
+                            s.start_time, 
+                            s.text,
+                            v.speaker,
+                            v.published_on
+                        FROM transcript_search
+                        JOIN transcript_segments AS s ON s.id = transcript_search.rowid
+                        JOIN videos AS v ON s.video_id = v.video_id
+                        WHERE transcript_search MATCH ?{date_filter}
+                        ORDER BY {SEARCH_ORDERS[order]}
+                        LIMIT ? OFFSET ?
+                    ''', (match_query,) + date_params + (page_size, offset))
+                    for title, video_id, start_time, text, speaker, published in c:
+                        response['results'].append(self._transcript_result(title, video_id, start_time, text, speaker, published))
+                    self._add_context(c, response['results'], context_size)
+
+                if search_titles:
+                    response['title_results'] = self._search_titles(
+                        c, query, match_query, *self._date_filter(start_date, end_date)
+                    )
+                # Cached responses are shared between callers and must not be modified
+                self.search_cache.put(cache_key, response)
+            except sqlite3.Error as e:
+                if cancel is not None and cancel.is_set():
+                    return None
+                print(f"Error searching transcripts: {e}")
+
+        return response
+
+    def search_transcripts(self, query, context_size=2, search_titles=True):
+        """Search transcripts and video titles, return all matches with context"""
+        match_query = compile_query(query, prefix=False)
+        if not match_query:
+            return []
+        results = []
+        with self.pool.cursor() as c:
+            try:
+                # First, search in transcript text
                 c.execute('''
                     SELECT 
                         v.title,
-                        v.url,
-                        v.video_id
-                    FROM videos AS v
-                    WHERE v.title LIKE ?
-                    ORDER BY v.title
-                ''', (f'%{query}%',))
-                
-                title_matches = c.fetchall()
-                
-                # Process title matches
-                for match in title_matches:
-                    title, video_url, video_id = match
-                    
-                    results.append({
-                        'title': title,
-                        'timestamp': '00:00:00',  # Start of video for title matches
-                        'url': video_url,
-                        'match': f"Title contains: '{query}'",
-                        'match_type': 'title',
-                        'context': [(f"Title match: {title}", 0, video_url)]
-                    })
-            
-            return results
-            
-        except Exception as e:
-            print(f"Error searching transcripts: {e}")
-            return []
-        finally:
-            conn.close()
+                        s.video_id,
+                        s.start_time, 
+                        s.text,
+                        v.speaker,
+                        v.published_on
+                    FROM transcript_search
+                    JOIN transcript_segments AS s ON s.id = transcript_search.rowid
+                    JOIN videos AS v ON s.video_id = v.video_id
+                    WHERE transcript_search MATCH ?
+                    ORDER BY v.title, s.start_time
+                ''', (match_query,))
+
+                for title, video_id, start_time, text, speaker, published in c:
+                    results.append(self._transcript_result(title, video_id, start_time, text, speaker, published))
+                self._add_context(c, results, context_size)
+
+                # If search_titles is enabled, also search video titles
+                if search_titles:
+                    results.extend(self._search_titles(c, query, match_query))
 
+                return results
 
+            except Exception as e:
+                print(f"Error searching transcripts: {e}")
+                return []
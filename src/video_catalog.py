@@ -0,0 +1,100 @@
+"""Parsed, cached view of data/transcripts/video_data.json
+
+The file is read once and re-read only when its mtime changes. Each
+video gets its publish date parsed and its speaker extracted up front.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# Define paths directly since config.py is not in repo
+VIDEO_DATA_PATH = Path(__file__).parent.parent / 'data' / 'transcripts' / 'video_data.json'
+
+
+def extract_speaker(description):
+    """Pull the speaker's name out of a Vimeo description, or None if there isn't one
+
+    Recognises "Speaker: <name>", "Presented by <name> on ..." and
+    "<name> preaches ...", in that order.
+    """
+    if not description:
+        return None
+
+    speaker = None
+    if 'Speaker:' in description:
+        start = description.index('Speaker:') + len('Speaker:')
+        speaker = description[start:].strip().split('\n')[0]
+    elif 'Presented by' in description:
+        start = description.index('Presented by') + len('Presented by')
+        end = description.find(' on ', start)
+        if end != -1:
+            speaker = description[start:end]
+    elif 'preaches' in description.lower():
+        speaker = description[:description.lower().index('preaches')]
+
+    speaker = speaker.strip() if speaker else None
+    return speaker or None
+
+
+def parse_published(date_str):
+    """Parse a video_data.json date into a datetime, or None"""
+    try:
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def published_on(date_str):
+    """Normalize a video_data.json date to YYYY-MM-DD, or None"""
+    published = parse_published(date_str)
+    if published:
+        return published.strftime('%Y-%m-%d')
+    return date_str[:10] if date_str else None
+
+
+class VideoCatalog:
+    def __init__(self, path=VIDEO_DATA_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._mtime_ns = None
+        self._videos = []
+
+    def _refresh(self):
+        """Reload the file if it changed since it was last read"""
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns == self._mtime_ns:
+            return
+
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                return
+            videos = []
+            if mtime_ns is not None:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    videos = json.load(f)
+
+            for video in videos:
+                published = parse_published(video.get('date'))
+                video['published'] = published
+                video['published_on'] = published_on(video.get('date')) or ''
+                video['year'] = published.year if published else None
+                video['speaker'] = extract_speaker(video.get('description'))
+
+            self._videos = videos
+            self._mtime_ns = mtime_ns
+
+    def exists(self):
+        """Whether video_data.json is present"""
+        self._refresh()
+        return self._mtime_ns is not None
+
+    @property
+    def videos(self):
+        """All videos, each with parsed 'published', 'published_on', 'year' and 'speaker' keys"""
+        self._refresh()
+        return self._videos
@@ -0,0 +1,81 @@
+"""Streaming parser for the auto-generated WebVTT transcripts
+
+Reads a file once and yields (start_seconds, end_seconds, text) tuples
+without building intermediate caption objects. Handles both HH:MM:SS.mmm
+and MM:SS.mmm timestamps, multi-line cues, cue settings after the end
+timestamp and NOTE/STYLE/REGION blocks.
+"""
+import re
+
+# Inline cue tags such as <c>, <i> or <unk>, stripped like webvtt-py's Caption.text
+CUE_TAGS = re.compile(r'<.*?>')
+
+_SKIPPED_BLOCKS = ('NOTE', 'STYLE', 'REGION')
+
+
+def timestamp_to_seconds(timestamp):
+    """Convert VTT timestamp to seconds"""
+    try:
+        # Fast path for the HH:MM:SS.mmm stamps in our transcripts
+        if len(timestamp) == 12 and timestamp[2] == ':' and timestamp[5] == ':':
+            return int(timestamp[:2]) * 3600 + int(timestamp[3:5]) * 60 + float(timestamp[6:])
+        parts = timestamp.split(':')
+        if len(parts) == 3:
+            h, m, s = parts
+            return int(h) * 3600 + int(m) * 60 + float(s)
+        elif len(parts) == 2: # Handle MM:SS.mmm
+            m, s = parts
+            return int(m) * 60 + float(s)
+        return 0.0
+    except ValueError:
+        return 0.0
+
+
+def iter_cues(vtt_file):
+    """Yield (start_time, end_time, text) for every cue in a VTT file"""
+    with open(vtt_file, 'r', encoding='utf-8-sig') as f:
+        start = end = None
+        lines = []
+        skipping = False
+
+        for line in f:
+            line = line.rstrip('\r\n')
+
+            if not line:
+                # A blank line ends the current block
+                if start is not None:
+                    text = '\n'.join(lines)
+                    if '<' in text:
+                        text = CUE_TAGS.sub('', text)
+                    yield start, end, text
+                start = None
+                lines = []
+                skipping = False
+                continue
+
+            if skipping:
+                continue
+
+            if start is None:
+                if '-->' in line:
+                    start_stamp, _, rest = line.partition('-->')
+                    end_stamp = rest.split(None, 1)[0] if rest.strip() else ''
+                    start = timestamp_to_seconds(start_stamp.strip())
+                    end = timestamp_to_seconds(end_stamp)
+                elif line.startswith(_SKIPPED_BLOCKS):
+                    skipping = True
+                # Anything else before the timing line is the WEBVTT header or a cue id
+                continue
+
+            lines.append(line)
+
+        if start is not None:
+            text = '\n'.join(lines)
+            if '<' in text:
+                text = CUE_TAGS.sub('', text)
+            yield start, end, text
+
+
+def parse_vtt(vtt_file):
+    """Parse a VTT file into compact (start_time, end_time, text) tuples"""
+    return list(iter_cues(vtt_file))
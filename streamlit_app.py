@@ -1,6 +1,8 @@
 # streamlit_app.py
 import streamlit as st
 import sys
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeout
 from pathlib import Path
 from collections import defaultdict
 import plotly.graph_objects as go
@@ -13,7 +15,9 @@ from collections import Counter
 # Add src to path
 sys.path.append(str(Path(__file__).parent))
 
-from src.transcript_manager import TranscriptManager
+from src.search_runner import SearchRunner
+from src.transcript_manager import TranscriptManager, vimeo_player_url
+from src.video_catalog import VideoCatalog
 from pathlib import Path
 
 # Define paths directly since config.py is not in repo
@@ -23,8 +27,6 @@ TRANSCRIPT_DIR = DATA_DIR / 'transcripts'
 DATABASE_DIR = DATA_DIR / 'database'
 DATABASE_PATH = DATABASE_DIR / 'transcripts.db'
 
-import json
-import sqlite3
 from datetime import datetime, timedelta
 from collections import defaultdict
 import os
@@ -128,24 +130,58 @@ if 'last_start_date' not in st.session_state:
     st.session_state.last_start_date = None
 if 'last_end_date' not in st.session_state:
     st.session_state.last_end_date = None
+if 'last_search_order' not in st.session_state:
+    st.session_state.last_search_order = None
+if 'last_search_page' not in st.session_state:
+    st.session_state.last_search_page = 1
 if 'search_results' not in st.session_state:
     st.session_state.search_results = None
+if 'search_session_id' not in st.session_state:
+    st.session_state.search_session_id = uuid.uuid4().hex
+
+# Transcript matches shown per page of search results
+RESULTS_PER_PAGE = 100
+
+# Search result orderings offered in the Home tab
+SEARCH_ORDERS = {
+    "Most relevant": 'relevance',
+    "Newest first": 'date'
+}
+
+# Completions offered under the search box for the word being typed
+SUGGESTION_COUNT = 6
+
+# How often a run waiting on a search checks whether newer input has arrived
+SEARCH_POLL_SECONDS = 0.05
 
 @st.cache_resource
 def get_transcript_manager():
-    """Cache the TranscriptManager instance"""
-    return TranscriptManager()
+    """Cache the TranscriptManager instance
+
+    The app only reads the database (update_database.py writes it), so it is
+    opened read-only: no schema changes at startup and no locks while serving.
+    """
+    return TranscriptManager(read_only=True)
+
+@st.cache_resource
+def get_search_runner():
+    """Cache the worker pool that runs searches for every session"""
+    return SearchRunner(get_transcript_manager())
+
+@st.cache_resource
+def get_video_catalog():
+    """Cache the VideoCatalog instance (it reloads when video_data.json changes)"""
+    return VideoCatalog(TRANSCRIPT_DIR / 'video_data.json')
 
 @st.cache_data
 def load_video_stats():
     """Load and cache video statistics"""
-    video_data_path = TRANSCRIPT_DIR / 'video_data.json'
-    if not video_data_path.exists():
+    catalog = get_video_catalog()
+    if not catalog.exists():
         return None
     
     try:
-        with open(video_data_path, 'r', encoding='utf-8') as f:
-            videos = json.load(f)
+        videos = catalog.videos
         
         # Calculate statistics
         total_videos = len(videos)
@@ -167,23 +203,16 @@ def load_video_stats():
             processed_ids = tm.get_processed_video_ids()
             db_processed = len(processed_ids)
             
-            conn = sqlite3.connect(DATABASE_PATH)
-            c = conn.cursor()
-            c.execute('SELECT COUNT(*) FROM transcript_segments')
-            total_segments = c.fetchone()[0]
-            conn.close()
+            total_segments = tm.get_segment_count()
         
         # Year breakdown with transcript info
         year_stats = defaultdict(lambda: {'total': 0, 'with_transcripts': 0})
         for video in videos:
-            try:
-                video_date = datetime.fromisoformat(video['date'].replace('Z', '+00:00'))
-                year = video_date.year
+            year = video['year']
+            if year:
                 year_stats[year]['total'] += 1
                 if video['id'] in transcript_video_ids:
                     year_stats[year]['with_transcripts'] += 1
-            except:
-                pass
         
         return {
             'total_videos': total_videos,
@@ -191,7 +220,6 @@ def load_video_stats():
             'db_processed': db_processed,
             'total_segments': total_segments,
             'year_stats': dict(year_stats),
-            'videos': videos,
             'transcript_video_ids': transcript_video_ids
         }
     except Exception as e:
@@ -208,51 +236,39 @@ def format_duration(seconds):
         minutes = seconds // 60
         return f"{minutes}m"
 
-def perform_search(search_query, start_date=None, end_date=None):
-    """Perform the actual search - always search both"""
+def perform_search(search_query, start_date=None, end_date=None, page=1, order='relevance'):
+    """Search on the worker pool - one page of transcript matches plus all title matches, or None if cancelled"""
     if not search_query or len(search_query) < 2:
         return None
     
-    tm = get_transcript_manager()
-    
-    # Get all results (no limit)
-    results = tm.search_transcripts(search_query, context_size=2, search_titles=True)
-    
-    # Filter by date if provided
-    if start_date or end_date:
-        # Load video data to get dates
-        video_data_path = TRANSCRIPT_DIR / 'video_data.json'
-        if video_data_path.exists():
-            with open(video_data_path, 'r', encoding='utf-8') as f:
-                videos = json.load(f)
-            
-            # Create a mapping of video titles to dates
-            video_dates = {}
-            for video in videos:
-                try:
-                    video_date = datetime.fromisoformat(video['date'].replace('Z', '+00:00')).date()
-                    video_dates[video['title']] = video_date
-                except:
-                    pass
-            
-            # Filter results by date
-            filtered_results = []
-            for result in results:
-                video_title = result['title']
-                if video_title in video_dates:
-                    video_date = video_dates[video_title]
-                    
-                    # Check date range
-                    if start_date and video_date < start_date:
-                        continue
-                    if end_date and video_date > end_date:
-                        continue
-                    
-                    filtered_results.append(result)
-            
-            results = filtered_results
-    
-    return results  # Return all results, no limit
+    runner = get_search_runner()
+    session_id = st.session_state.search_session_id
+    future = runner.submit(
+        session_id,
+        search_query,
+        page=page,
+        page_size=RESULTS_PER_PAGE,
+        order=order,
+        search_titles=True,
+        start_date=start_date,
+        end_date=end_date
+    )
+    try:
+        while True:
+            try:
+                return future.result(timeout=SEARCH_POLL_SECONDS)
+            except FutureTimeout:
+                # Touching session state lets Streamlit stop this run if the
+                # user has typed on; the finally below then cancels the search
+                st.session_state.search_session_id
+    finally:
+        if not future.done():
+            runner.cancel(session_id)
+
+def apply_suggestion(term):
+    """Replace the word being typed in the search box with a suggested term"""
+    words = st.session_state.search_input.rsplit(None, 1)
+    st.session_state.search_input = ' '.join(words[:-1] + [term]) + ' '
 
 def results_to_dataframe(results, result_type='all'):
     """Convert search results to a pandas DataFrame"""
@@ -268,54 +284,11 @@ def results_to_dataframe(results, result_type='all'):
     if not results:
         return None
     
-    # Load video data to get descriptions/speakers and dates
-    video_data_path = TRANSCRIPT_DIR / 'video_data.json'
-    speaker_map = {}
-    date_map = {}
-    
-    if video_data_path.exists():
-        with open(video_data_path, 'r', encoding='utf-8') as f:
-            videos = json.load(f)
-        
-        # Extract speaker names and dates from descriptions
-        for video in videos:
-            speaker = "Unknown"
-            desc = video.get('description', '')
-            
-            if desc and 'Speaker:' in desc:
-                try:
-                    start = desc.index('Speaker:') + len('Speaker:')
-                    rest = desc[start:].strip()
-                    speaker = rest.split('\n')[0].strip()
-                except:
-                    pass
-            elif desc and 'Presented by' in desc:
-                try:
-                    start = desc.index('Presented by') + len('Presented by')
-                    end = desc.index(' on ', start)
-                    speaker = desc[start:end].strip()
-                except:
-                    pass
-            elif desc and 'preaches' in desc.lower():
-                try:
-                    speaker = desc.split('preaches')[0].strip()
-                except:
-                    pass
-            
-            speaker_map[video['title']] = speaker
-            
-            # Get date
-            try:
-                video_date = datetime.fromisoformat(video['date'].replace('Z', '+00:00'))
-                date_map[video['title']] = video_date.strftime('%Y-%m-%d')
-            except:
-                date_map[video['title']] = video.get('date', '')[:10]
-    
     data = []
     for result in results:
         match_type = result.get('match_type', 'transcript')
-        speaker = speaker_map.get(result['title'], 'Unknown')
-        date = date_map.get(result['title'], '')
+        speaker = result.get('speaker') or 'Unknown'
+        date = result.get('published_on') or ''
         
         if match_type == 'title':
             data.append({
@@ -328,13 +301,15 @@ def results_to_dataframe(results, result_type='all'):
                 'URL': result['url']
             })
         else:
+            # Show the match together with its surrounding cues
+            match = ' '.join(text for text, _, _ in result['context']) or result['match']
             data.append({
                 'Type': 'Transcript',
                 'Date': date,
                 'Speaker': speaker,
                 'Video Title': result['title'],
                 'Timestamp': result['timestamp'],
-                'Match': result['match'][:150] + '...' if len(result['match']) > 150 else result['match'],
+                'Match': match[:300] + '...' if len(match) > 300 else match,
                 'URL': result['url']
             })
     
@@ -369,10 +344,30 @@ def main():
         search_query = st.text_input(
             "Enter search terms:",
             placeholder="e.g., 'faith', 'prayer', 'salvation', 'grace', etc.",
-            help="Search updates as you type",
+            help="Search updates as you type; the last word also matches longer words it starts",
             key="search_input"
         )
         
+        # Completions for the last word, with the number of sermons using each
+        suggestions = get_transcript_manager().suggest(search_query, limit=SUGGESTION_COUNT)
+        if suggestions:
+            for col, (term, sermons) in zip(st.columns(SUGGESTION_COUNT), suggestions):
+                with col:
+                    st.button(
+                        f"{term} ({sermons})",
+                        key=f"suggestion_{term}",
+                        help=f"Appears in {sermons} sermon{'s' if sermons != 1 else ''}",
+                        on_click=apply_suggestion,
+                        args=(term,)
+                    )
+        
+        order_label = st.selectbox(
+            "Sort by",
+            list(SEARCH_ORDERS),
+            key="search_order_input"
+        )
+        search_order = SEARCH_ORDERS[order_label]
+        
         # Date filter (optional) - more compact
         with st.expander("Date Filter (Optional)"):
             col1, col2 = st.columns(2)
@@ -395,12 +390,22 @@ def main():
                 if start_date and end_date and start_date > end_date:
                     st.error("Start date must be before end date")
         
+        # A new query, date range or ordering starts again from the first page
+        if (search_query != st.session_state.last_search_query or
+            start_date != st.session_state.last_start_date or
+            end_date != st.session_state.last_end_date or
+            search_order != st.session_state.last_search_order):
+            st.session_state.search_page = 1
+        search_page = st.session_state.get('search_page', 1)
+        
         # Check if search should be triggered
         should_search = False
         if search_query:
             if (search_query != st.session_state.last_search_query or
                 start_date != st.session_state.last_start_date or
-                end_date != st.session_state.last_end_date):
+                end_date != st.session_state.last_end_date or
+                search_order != st.session_state.last_search_order or
+                search_page != st.session_state.last_search_page):
                 should_search = True
         
         # Perform search automatically when conditions change
@@ -414,23 +419,32 @@ def main():
                     st.error("Start date must be before end date")
                     st.session_state.search_results = None
                 else:
-                    # Update session state
-                    st.session_state.last_search_query = search_query
-                    st.session_state.last_start_date = start_date
-                    st.session_state.last_end_date = end_date
-                    
                     with st.spinner("Searching..."):
-                        results = perform_search(search_query, start_date, end_date)
-                        st.session_state.search_results = results
+                        response = perform_search(search_query, start_date, end_date, search_page, search_order)
+                        st.session_state.search_results = response
+                    
+                    # Only a finished search may label the results; a cancelled one is run again
+                    if response is not None:
+                        st.session_state.last_search_query = search_query
+                        st.session_state.last_start_date = start_date
+                        st.session_state.last_end_date = end_date
+                        st.session_state.last_search_order = search_order
+                        st.session_state.last_search_page = search_page
         
         # Display results if they exist
         if st.session_state.search_results is not None:
-            results = st.session_state.search_results
+            response = st.session_state.search_results
+            
+            # Title matches are listed with the first page of transcript matches
+            results = response['results']
+            if response['page'] == 1:
+                results = response['title_results'] + results
             
-            if results:
+            if response['total'] or response['title_results']:
                 # Summary
-                transcript_count = len([r for r in results if r.get('match_type') == 'transcript'])
-                title_count = len([r for r in results if r.get('match_type') == 'title'])
+                transcript_count = response['total']
+                title_count = len(response['title_results'])
+                total_count = transcript_count + title_count
                 
                 date_filter_text = ""
                 if st.session_state.last_start_date or st.session_state.last_end_date:
@@ -441,18 +455,37 @@ def main():
                     elif st.session_state.last_end_date:
                         date_filter_text = f" (up to {st.session_state.last_end_date})"
                 
-                st.success(f"Found {len(results)} matches for '{st.session_state.last_search_query}'{date_filter_text}")
+                st.success(f"Found {total_count} matches for '{st.session_state.last_search_query}'{date_filter_text}")
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("Total Matches", len(results))
+                    st.metric("Total Matches", total_count)
                 with col2:
                     st.metric("Title Matches", title_count)
                 with col3:
                     st.metric("Transcript Matches", transcript_count)
                 
-                # Tabs for different result types
-                if title_count > 0 and transcript_count > 0:
+                # Paging through transcript matches
+                page_count = max(1, -(-transcript_count // response['page_size']))
+                if page_count > 1:
+                    col1, col2 = st.columns([1, 3])
+                    with col1:
+                        st.number_input(
+                            f"Page (of {page_count})",
+                            min_value=1,
+                            max_value=page_count,
+                            step=1,
+                            key="search_page"
+                        )
+                    with col2:
+                        first = (response['page'] - 1) * response['page_size'] + 1
+                        last = min(response['page'] * response['page_size'], transcript_count)
+                        st.caption(f"Showing transcript matches {first}-{last} of {transcript_count}")
+                
+                # Tabs for different result types on this page
+                page_has_titles = any(r['match_type'] == 'title' for r in results)
+                page_has_transcripts = any(r['match_type'] == 'transcript' for r in results)
+                if page_has_titles and page_has_transcripts:
                     result_tab1, result_tab2, result_tab3 = st.tabs(["All Results", "Title Matches", "Transcript Matches"])
                     
                     with result_tab1:
@@ -542,143 +575,88 @@ def main():
     with tab2:
         st.header("Video List")
         
-        # Load video data
-        video_data_path = TRANSCRIPT_DIR / 'video_data.json'
-        if not video_data_path.exists():
-            st.error("Video data not found")
-            return
-        
-        with open(video_data_path, 'r', encoding='utf-8') as f:
-            all_videos = json.load(f)
-        
-        # Extract speakers from all videos
-        speakers_set = set()
-        video_speakers = {}
-        for video in all_videos:
-            desc = video.get('description', '')
-            speaker = "Unknown"
-            
-            if desc and 'Speaker:' in desc:
-                try:
-                    start = desc.index('Speaker:') + len('Speaker:')
-                    speaker = desc[start:].strip().split('\n')[0].strip()
-                except:
-                    pass
-            elif desc and 'Presented by' in desc:
-                try:
-                    start = desc.index('Presented by') + len('Presented by')
-                    end = desc.index(' on ', start)
-                    speaker = desc[start:end].strip()
-                except:
-                    pass
-            elif desc and 'preaches' in desc.lower():
-                try:
-                    speaker = desc.split('preaches')[0].strip()
-                except:
-                    pass
-            
-            speakers_set.add(speaker)
-            video_speakers[video['id']] = speaker
-        
         # Filters
         st.subheader("Filters")
         col1, col2, col3, col4 = st.columns(4)
         
+        tm = get_transcript_manager()
+        
+        # Every value is offered, labelled with how many sermons it would leave
+        # given the other filters ("Unknown" means no speaker was found)
+        all_counts = tm.get_facet_counts()
+        options = {
+            "video_list_speaker": ["All"] + sorted(value or "Unknown" for value in all_counts['speaker']),
+            "video_list_year": ["All"] + sorted((int(year) for year in all_counts['year']), reverse=True),
+            "video_list_book": ["All"] + sorted(all_counts['book']),
+            "video_list_topic": ["All"] + sorted(all_counts['topic'])
+        }
+        
+        # The labels change with the counts, which gives the widgets new ids,
+        # so carry the previous selections over through session state
+        for key, key_options in options.items():
+            value = st.session_state.get(key)
+            st.session_state[key] = value if value in key_options else "All"
+        
+        def selected(key):
+            value = st.session_state[key]
+            if value == "All":
+                return None
+            return '' if value == "Unknown" and key == "video_list_speaker" else value
+        
+        counts = tm.get_facet_counts(
+            speaker=selected("video_list_speaker"),
+            year=selected("video_list_year"),
+            book=selected("video_list_book"),
+            topic=selected("video_list_topic")
+        )
+        
+        def with_count(facet):
+            def format_option(option):
+                if option == "All":
+                    return option
+                value = '' if facet == 'speaker' and option == "Unknown" else str(option)
+                return f"{option} ({counts[facet].get(value, 0)})"
+            return format_option
+        
         with col1:
-            speaker_filter = st.selectbox(
+            st.selectbox(
                 "Speaker",
-                ["All"] + sorted(list(speakers_set)),
+                options["video_list_speaker"],
+                format_func=with_count('speaker'),
                 key="video_list_speaker"
             )
         
         with col2:
-            # Get unique years
-            years = set()
-            for video in all_videos:
-                try:
-                    video_date = datetime.fromisoformat(video['date'].replace('Z', '+00:00'))
-                    years.add(video_date.year)
-                except:
-                    pass
-            
-            year_filter = st.selectbox(
+            st.selectbox(
                 "Year",
-                ["All"] + sorted(list(years), reverse=True),
+                options["video_list_year"],
+                format_func=with_count('year'),
                 key="video_list_year"
             )
         
         with col3:
-            # Get books from bible_references table
-            conn = sqlite3.connect(DATABASE_PATH)
-            c = conn.cursor()
-            c.execute('SELECT DISTINCT book FROM bible_references ORDER BY book')
-            books = [row[0] for row in c.fetchall()]
-            
-            book_filter = st.selectbox(
+            st.selectbox(
                 "Bible Book",
-                ["All"] + books,
+                options["video_list_book"],
+                format_func=with_count('book'),
                 key="video_list_book"
             )
         
         with col4:
-            # Get topics from theological_topics table
-            c.execute('SELECT DISTINCT topic FROM theological_topics ORDER BY topic')
-            topics = [row[0] for row in c.fetchall()]
-            
-            topic_filter = st.selectbox(
+            st.selectbox(
                 "Theological Topic",
-                ["All"] + topics,
+                options["video_list_topic"],
+                format_func=with_count('topic'),
                 key="video_list_topic"
             )
         
-        # Build filtered video list
-        filtered_videos = []
-        
-        # Get list of videos that are in the database (have transcripts)
-        c.execute('SELECT DISTINCT video_id FROM transcript_segments')
-        videos_in_db = set(row[0] for row in c.fetchall())
-        
-        for video in all_videos:
-            # Check if video is in database (has transcript)
-            if video['id'] not in videos_in_db:
-                continue  # Skip videos without transcripts
-
-            
-            # Apply speaker filter
-            if speaker_filter != "All":
-                if video_speakers.get(video['id']) != speaker_filter:
-                    continue
-            
-            # Apply year filter
-            if year_filter != "All":
-                try:
-                    video_date = datetime.fromisoformat(video['date'].replace('Z', '+00:00'))
-                    if video_date.year != year_filter:
-                        continue
-                except:
-                    continue
-            
-            # Apply book filter
-            if book_filter != "All":
-                c.execute('''
-                    SELECT COUNT(*) FROM bible_references 
-                    WHERE video_id = ? AND book = ?
-                ''', (video['id'], book_filter))
-                if c.fetchone()[0] == 0:
-                    continue
-            
-            # Apply topic filter
-            if topic_filter != "All":
-                c.execute('''
-                    SELECT COUNT(*) FROM theological_topics 
-                    WHERE video_id = ? AND topic = ?
-                ''', (video['id'], topic_filter))
-                if c.fetchone()[0] == 0:
-                    continue
-            
-            filtered_videos.append(video)
-        
-        conn.close()
+        # Resolve every filter in one query
+        filtered_videos = tm.filter_videos(
+            speaker=selected("video_list_speaker"),
+            year=selected("video_list_year"),
+            book=selected("video_list_book"),
+            topic=selected("video_list_topic")
+        )
         
         # Display results
         st.markdown("---")
@@ -688,24 +666,12 @@ def main():
             # Create dataframe
             video_list_data = []
             for video in filtered_videos:
-                try:
-                    video_date = datetime.fromisoformat(video['date'].replace('Z', '+00:00'))
-                    date_str = video_date.strftime('%Y-%m-%d')
-                except:
-                    date_str = video['date'][:10]
-                
-                speaker = video_speakers.get(video['id'], 'Unknown')
-                
-                # Use player URL format
-                video_id = video['url'].split('/')[-1]
-                player_url = f"https://player.vimeo.com/video/{video_id}"
-                
                 video_list_data.append({
-                    'Date': date_str,
-                    'Speaker': speaker,
+                    'Date': video['published_on'],
+                    'Speaker': video['speaker'] or 'Unknown',
                     'Title': video['title'],
-                    'Duration': format_duration(video.get('duration', 0)),
-                    'URL': player_url
+                    'Duration': format_duration(video['duration'] or 0),
+                    'URL': vimeo_player_url(video['video_id'])
                 })
             
             df = pd.DataFrame(video_list_data)
@@ -736,52 +702,11 @@ def main():
         
         with col1:
             # Get speakers from videos that have Bible references
-            conn_temp = sqlite3.connect(DATABASE_PATH)
-            c_temp = conn_temp.cursor()
-            
-            # Get video IDs that have Bible references
-            c_temp.execute('SELECT DISTINCT video_id FROM bible_references')
-            video_ids_with_refs = [row[0] for row in c_temp.fetchall()]
-            conn_temp.close()
-            
-            # Load video data and extract speakers from those videos
-            video_data_path = TRANSCRIPT_DIR / 'video_data.json'
-            speakers = set()
-            
-            if video_data_path.exists():
-                with open(video_data_path, 'r', encoding='utf-8') as f:
-                    videos_data = json.load(f)
-                
-                for video in videos_data:
-                    if video['id'] in video_ids_with_refs:
-                        desc = video.get('description', '')
-                        speaker = None
-                        
-                        if desc and 'Speaker:' in desc:
-                            try:
-                                start = desc.index('Speaker:') + len('Speaker:')
-                                speaker = desc[start:].strip().split('\n')[0].strip()
-                            except:
-                                pass
-                        elif desc and 'Presented by' in desc:
-                            try:
-                                start = desc.index('Presented by') + len('Presented by')
-                                end = desc.index(' on ', start)
-                                speaker = desc[start:end].strip()
-                            except:
-                                pass
-                        elif desc and 'preaches' in desc.lower():
-                            try:
-                                speaker = desc.split('preaches')[0].strip()
-                            except:
-                                pass
-                        
-                        if speaker:
-                            speakers.add(speaker)
+            speakers = get_transcript_manager().get_speakers(with_bible_references=True)
             
             speaker_filter = st.selectbox(
                 "Filter by Speaker",
-                ["All Speakers"] + sorted(list(speakers)),
+                ["All Speakers"] + speakers,
                 key="bible_speaker_filter"
             )
 
@@ -806,85 +731,12 @@ def main():
                 key="testament_filter"
             )
         
-        # Query bible references with filters
-        conn = sqlite3.connect(DATABASE_PATH)
-        c = conn.cursor()
-        
-        # Build query based on filters
-        query = '''
-            SELECT br.book, COUNT(*) as count
-            FROM bible_references br
-            JOIN videos v ON br.video_id = v.video_id
-            WHERE 1=1
-        '''
-        params = []
-        
-        # Apply year filter
-        if year_filter != "All Years":
-            query += " AND strftime('%Y', v.date_published) = ?"
-            params.append(str(year_filter))
-        
-        # Apply speaker filter (need to join with video_data.json)
-        # We'll filter in Python after getting results
-        
-        query += " GROUP BY br.book ORDER BY count DESC"
-        
-        c.execute(query, params)
-        book_counts = c.fetchall()
-        
-        # Filter by speaker if needed (requires checking descriptions)
-        if speaker_filter != "All Speakers":
-            # Load video data
-            video_data_path = TRANSCRIPT_DIR / 'video_data.json'
-            if video_data_path.exists():
-                with open(video_data_path, 'r', encoding='utf-8') as f:
-                    videos_data = json.load(f)
-                
-                # Get video IDs for this speaker
-                speaker_video_ids = set()
-                for video in videos_data:
-                    desc = video.get('description', '')
-                    speaker = None
-                    
-                    if desc and 'Presented by' in desc:
-                        try:
-                            start = desc.index('Presented by') + len('Presented by')
-                            end = desc.index(' on ', start)
-                            speaker = desc[start:end].strip()
-                        except:
-                            pass
-                    elif desc and 'Speaker:' in desc:
-                        try:
-                            start = desc.index('Speaker:') + len('Speaker:')
-                            speaker = desc[start:].strip().split('\n')[0].strip()
-                        except:
-                            pass
-                    
-                    if speaker == speaker_filter:
-                        speaker_video_ids.add(video['id'])
-                
-                # Re-query with speaker filter
-                if speaker_video_ids:
-                    placeholders = ','.join('?' * len(speaker_video_ids))
-                    query = f'''
-                        SELECT br.book, COUNT(*) as count
-                        FROM bible_references br
-                        WHERE br.video_id IN ({placeholders})
-                    '''
-                    if year_filter != "All Years":
-                        query += '''
-                            AND br.video_id IN (
-                                SELECT video_id FROM videos 
-                                WHERE strftime('%Y', date_published) = ?
-                            )
-                        '''
-                        params = list(speaker_video_ids) + [str(year_filter)]
-                    else:
-                        params = list(speaker_video_ids)
-                    
-                    query += " GROUP BY br.book ORDER BY count DESC"
-                    c.execute(query, params)
-                    book_counts = c.fetchall()
+        # Read reference counts from the pre-aggregated summary
+        tm = get_transcript_manager()
+        book_counts = tm.get_book_counts(
+            year=None if year_filter == "All Years" else year_filter,
+            speaker=None if speaker_filter == "All Speakers" else speaker_filter
+        )
         
         # Define book order and testament
         old_testament_books = [
@@ -1073,15 +925,7 @@ def main():
             
             if selected_book:
                 # Get chapter/verse breakdown
-                c.execute('''
-                    SELECT chapter, verse_start, verse_end, COUNT(*) as count
-                    FROM bible_references
-                    WHERE book = ?
-                    GROUP BY chapter, verse_start, verse_end
-                    ORDER BY chapter, verse_start
-                ''', (selected_book,))
-                
-                chapter_data = c.fetchall()
+                chapter_data = tm.get_verse_counts(selected_book)
                 
                 if chapter_data:
                     st.markdown(f"**{selected_book} - Chapter & Verse References**")
@@ -1099,44 +943,34 @@ def main():
                         
                         chapters[chapter].append((verse_ref, count))
                     
-                    # Display by chapter (handle None for standalone mentions)
-                    sorted_chapters = sorted([c for c in chapters.keys() if c is not None])
-                    if None in chapters:
-                        sorted_chapters.append(None)
+                    # Display by chapter, with totals from the summary (general mentions last)
+                    chapter_counts = tm.get_chapter_counts(selected_book)
+                    chapter_counts.sort(key=lambda item: item[0] is None)
+                    
+                    # Sermons that reference each chapter, fetched for all chapters at once
+                    chapter_sermons = tm.get_chapter_sermons(selected_book, limit=10)
                     
-                    for chapter in sorted_chapters:
+                    for chapter, chapter_total in chapter_counts:
                         if chapter is None:
                             chapter_label = "General mentions (no specific chapter)"
                         else:
                             chapter_label = f"Chapter {chapter}"
                         
-                        with st.expander(f"{chapter_label} ({sum(c for _, c in chapters[chapter])} references)"):
+                        with st.expander(f"{chapter_label} ({chapter_total} references)"):
                             for verse_ref, count in chapters[chapter]:
                                 st.write(f"  Verse {verse_ref}: {count} mentions")
                             
                             # Show sermons that reference this chapter
-                            c.execute('''
-                                SELECT DISTINCT v.title, v.url, br.start_time
-                                FROM bible_references br
-                                JOIN videos v ON br.video_id = v.video_id
-                                WHERE br.book = ? AND br.chapter = ?
-                                ORDER BY v.date_published DESC
-                                LIMIT 10
-                            ''', (selected_book, chapter))
-                            
-                            sermons = c.fetchall()
+                            sermons = chapter_sermons.get(chapter, [])
                             if sermons:
                                 st.markdown("**Sermons referencing this chapter:**")
-                                for title, url, start_time in sermons:
-                                    timestamp_url = f"https://player.vimeo.com/video/{video_id}#t={int(start_time)}s"
-                                    st.markdown(f"- [{title}]({timestamp_url})")
+                                for title, video_id, start_time in sermons:
+                                    st.markdown(f"- [{title}]({vimeo_player_url(video_id, start_time)})")
                 
                         
         else:
             st.info("No Bible references found in database. Run extract_bible_references.py first.")
         
-        conn.close()
-        
         
                 
         # Add white space at the bottom